@@ -0,0 +1,291 @@
+# backend/agents/triage_classifier.py
+import glob
+import json
+import os
+import re
+import time
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from tools.tenant_kb import get_active_tenant
+
+# --- Classifier Configuration ---
+ROUTES: Tuple[str, ...] = ("FAQ", "TECH", "BILLING")
+MODEL_DIR = os.getenv(
+    "TRIAGE_CLASSIFIER_DIR",
+    os.path.join(os.path.dirname(__file__), "../data/models"),
+)
+ROUTING_LOG_PATH = os.getenv(
+    "ROUTING_LOG_PATH",
+    os.path.join(os.path.dirname(__file__), "../data/routing_log.jsonl"),
+)
+# Predictions at or above this probability skip the LLM triage agent
+TRIAGE_CLASSIFIER_THRESHOLD = float(os.getenv("TRIAGE_CLASSIFIER_THRESHOLD", "0.9"))
+DEFAULT_N_FEATURES = 2**14
+
+_ARTIFACT_PATTERN = re.compile(r"triage_classifier_v(\d+)\.npz$")
+# Personal data removed from queries before they are written to the routing log
+_EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_CUSTOMER_ID_PATTERN = re.compile(r"\bcustomer[_ ]\d+\b", re.IGNORECASE)
+
+
+def normalize_route(label: str) -> Optional[str]:
+    """Map logged labels ("ROUTE_TECH", "tech", "Billing", ...) onto ROUTES."""
+    label = label.strip().upper().replace("ROUTE_", "")
+    return label if label in ROUTES else None
+
+
+def _words(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9_$]+", text.lower())
+
+
+def normalize_query(query: str) -> str:
+    """Lowercased words of a query; queries that normalize alike hash alike."""
+    return " ".join(_words(query))
+
+
+def redact_query(query: str) -> str:
+    """Replace email addresses and customer IDs so they never reach the routing log.
+    hash_features applies it too, so live queries and logged (already redacted)
+    queries produce the same features."""
+    query = _EMAIL_PATTERN.sub("<email>", query)
+    return _CUSTOMER_ID_PATTERN.sub("customer_<id>", query)
+
+
+# --- Feature Hashing ---
+def hash_features(text: str, n_features: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Hash word unigrams and bigrams into a sparse, L2-normalized feature vector.
+    Returns (indices, values). crc32 keeps hashes stable across processes.
+    The text is redacted first, matching the queries in the routing log."""
+    words = _words(redact_query(text))
+    tokens = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    counts: Dict[int, float] = {}
+    for token in tokens:
+        h = zlib.crc32(token.encode())
+        index = h % n_features
+        sign = 1.0 if h & 0x80000000 else -1.0
+        counts[index] = counts.get(index, 0.0) + sign
+    if not counts:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+    indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+    values = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+    norm = np.linalg.norm(values)
+    if norm > 0:
+        values /= norm
+    return indices, values
+
+
+def _softmax(scores: np.ndarray) -> np.ndarray:
+    exp = np.exp(scores - scores.max())
+    return exp / exp.sum()
+
+
+class TriageClassifier:
+    """Hashed-feature multinomial logistic regression over the triage routes."""
+
+    def __init__(
+        self,
+        weights: np.ndarray,
+        bias: np.ndarray,
+        routes: Sequence[str] = ROUTES,
+        version: int = 0,
+        metadata: Optional[Dict] = None,
+    ):
+        self.weights = weights
+        self.bias = bias
+        self.routes = tuple(routes)
+        self.version = version
+        self.metadata = metadata or {}
+        self.n_features = weights.shape[1]
+
+    def predict_proba(self, query: str) -> np.ndarray:
+        indices, values = hash_features(query, self.n_features)
+        return _softmax(self.weights[:, indices] @ values + self.bias)
+
+    def predict(self, query: str) -> Tuple[str, float]:
+        """Return (route, probability) for the most likely route."""
+        probabilities = self.predict_proba(query)
+        best = int(probabilities.argmax())
+        return self.routes[best], float(probabilities[best])
+
+    def predict_if_confident(
+        self, query: str, threshold: float = TRIAGE_CLASSIFIER_THRESHOLD
+    ) -> Optional[Tuple[str, float]]:
+        """Return (route, probability) if it may bypass the LLM triage agent, else None."""
+        route, probability = self.predict(query)
+        return (route, probability) if probability >= threshold else None
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        np.savez(
+            path,
+            weights=self.weights,
+            bias=self.bias,
+            routes=np.array(self.routes),
+            metadata=np.array(json.dumps({**self.metadata, "version": self.version})),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "TriageClassifier":
+        with np.load(path) as artifact:
+            metadata = json.loads(str(artifact["metadata"]))
+            return cls(
+                weights=artifact["weights"],
+                bias=artifact["bias"],
+                routes=[str(route) for route in artifact["routes"]],
+                version=metadata.get("version", 0),
+                metadata=metadata,
+            )
+
+
+# --- Training ---
+def train_triage_classifier(
+    examples: Sequence[Tuple[str, str]],
+    n_features: int = DEFAULT_N_FEATURES,
+    epochs: int = 20,
+    learning_rate: float = 0.5,
+    l2: float = 1e-4,
+    seed: int = 0,
+) -> TriageClassifier:
+    """Fit the classifier on (query, route) pairs with sparse SGD."""
+    route_index = {route: i for i, route in enumerate(ROUTES)}
+    features = [hash_features(query, n_features) for query, _ in examples]
+    labels = np.array([route_index[route] for _, route in examples])
+    weights = np.zeros((len(ROUTES), n_features), dtype=np.float32)
+    bias = np.zeros(len(ROUTES), dtype=np.float32)
+    rng = np.random.default_rng(seed)
+
+    for epoch in range(epochs):
+        rate = learning_rate / (1 + epoch)
+        for i in rng.permutation(len(examples)):
+            indices, values = features[i]
+            probabilities = _softmax(weights[:, indices] @ values + bias)
+            probabilities[labels[i]] -= 1.0
+            weights[:, indices] -= rate * (
+                np.outer(probabilities, values) + l2 * weights[:, indices]
+            )
+            bias -= rate * probabilities
+
+    return TriageClassifier(weights, bias, ROUTES)
+
+
+# --- Training Data ---
+def load_routing_records(paths: Iterable[str]) -> List[Dict[str, Any]]:
+    """Read routing decisions from JSON-lines files such as the production routing
+    log. Each line needs a query ("query", "message" or "input") and a final route
+    ("route" or "label"). Returned records also carry the LLM triage agent's own
+    route ("llm_route") and "timestamp", None when not logged. Decisions made by
+    the classifier itself are skipped so it never trains on its own output."""
+    records = []
+    for path in paths:
+        with open(path, "r") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get("source") == "classifier":
+                    continue
+                query = record.get("query") or record.get("message") or record.get("input")
+                route = normalize_route(str(record.get("route") or record.get("label") or ""))
+                if query and route:
+                    records.append(
+                        {
+                            "query": query,
+                            "route": route,
+                            "llm_route": normalize_route(str(record.get("llm_route") or "")),
+                            "timestamp": record.get("timestamp"),
+                        }
+                    )
+    return records
+
+
+def load_routing_examples(paths: Iterable[str]) -> List[Tuple[str, str]]:
+    """Read (query, final route) pairs; see load_routing_records."""
+    return [(record["query"], record["route"]) for record in load_routing_records(paths)]
+
+
+def dedupe_routing_records(records: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Keep one record per normalized query, the most recently logged one, so
+    repeated queries cannot land on both sides of a train/holdout split."""
+    latest: Dict[str, Dict[str, Any]] = {}
+    for record in sorted(records, key=lambda record: record["timestamp"] or 0):
+        key = normalize_query(record["query"])
+        latest.pop(key, None)
+        latest[key] = record
+    return list(latest.values())
+
+
+def split_routing_records(
+    records: Sequence[Dict[str, Any]], holdout: float, seed: int = 0, by_time: bool = False
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Split records into (train, holdout). With by_time the newest records are
+    held out (records without a timestamp count as oldest); otherwise the split
+    is random. Dedupe first (dedupe_routing_records) to avoid leakage."""
+    n_holdout = max(1, int(len(records) * holdout))
+    if by_time:
+        ordered = sorted(records, key=lambda record: record["timestamp"] or 0)
+        return ordered[:-n_holdout], ordered[-n_holdout:]
+    order = np.random.default_rng(seed).permutation(len(records))
+    test = [records[i] for i in order[:n_holdout]]
+    train = [records[i] for i in order[n_holdout:]]
+    return train, test
+
+
+def log_routing_decision(
+    query: str,
+    route: str,
+    source: str,
+    latency_seconds: Optional[float] = None,
+    llm_route: Optional[str] = None,
+    path: str = ROUTING_LOG_PATH,
+) -> None:
+    """Append a final routing decision to the log the classifier is trained from.
+    `llm_route` is the LLM triage agent's own decision, before keyword and
+    customer ID overrides. The query is redacted (see redact_query) and the
+    decision is attributed to the active tenant."""
+    record = {
+        "query": redact_query(query),
+        "route": route,
+        "llm_route": llm_route,
+        "source": source,
+        "tenant_id": get_active_tenant(),
+        "latency_ms": round(latency_seconds * 1000, 3) if latency_seconds is not None else None,
+        "timestamp": time.time(),
+    }
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError as e:
+        print(f"Warning: Could not write routing log: {e}")
+
+
+# --- Versioned Artifacts ---
+def artifact_path(version: int, model_dir: str = MODEL_DIR) -> str:
+    return os.path.join(model_dir, f"triage_classifier_v{version}.npz")
+
+
+def latest_artifact_version(model_dir: str = MODEL_DIR) -> int:
+    versions = [
+        int(match.group(1))
+        for match in map(
+            _ARTIFACT_PATTERN.search, glob.glob(os.path.join(model_dir, "*.npz"))
+        )
+        if match
+    ]
+    return max(versions, default=0)
+
+
+def load_latest_triage_classifier(model_dir: str = MODEL_DIR) -> Optional[TriageClassifier]:
+    """Load the newest classifier artifact, or None if none has been trained."""
+    version = latest_artifact_version(model_dir)
+    if version == 0:
+        return None
+    try:
+        return TriageClassifier.load(artifact_path(version, model_dir))
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Warning: Could not load triage classifier v{version}: {e}")
+        return None
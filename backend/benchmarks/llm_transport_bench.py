@@ -0,0 +1,176 @@
+# backend/benchmarks/llm_transport_bench.py
+"""Measure cold vs. warmed LLM call latency through LLMClientPool against a local stub.
+
+The stub speaks the Gemini REST generateContent API. Real LLMClientPool clients
+(ChatGoogleGenerativeAI on the REST transport, with the sized HTTPAdapter mounted)
+are pointed at it via client_options["api_endpoint"]. The stub can add a delay to
+every *new* connection (--connect-ms) to stand in for the TCP + TLS setup to the
+real API, which a loopback HTTP server does not have. It also counts the
+connections the clients actually open, so connection reuse is observed rather than
+assumed. Run from the backend directory:
+
+    python benchmarks/llm_transport_bench.py [--calls 30] [--concurrency 8] [--connect-ms 60]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+warnings.simplefilter("ignore")  # Deprecation notices from the Gemini SDK
+
+from llm_clients import LLMClientPool  # noqa: E402
+
+STUB_MODEL = "stub-model"
+STUB_RESPONSE = json.dumps(
+    {
+        "candidates": [
+            {
+                "content": {"parts": [{"text": "OK"}], "role": "model"},
+                "finishReason": "STOP",
+            }
+        ]
+    }
+).encode()
+
+
+class StubLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Allow keep-alive
+    disable_nagle_algorithm = True
+    connect_delay = 0.0
+    response_delay = 0.0
+    connections = 0
+    _lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with StubLLMHandler._lock:
+            StubLLMHandler.connections += 1
+        time.sleep(self.connect_delay)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.response_delay)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(STUB_RESPONSE)))
+        self.end_headers()
+        self.wfile.write(STUB_RESPONSE)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _quiet_warm_up(pool: LLMClientPool) -> None:
+    with contextlib.redirect_stdout(io.StringIO()):
+        pool.warm_up()
+
+
+def _timed(call: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    call()
+    return time.perf_counter() - start
+
+
+def _report(label: str, latencies: List[float], connections: int) -> None:
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(
+        f"{label:<36} p50 {statistics.median(ordered) * 1000:7.1f} ms   "
+        f"p95 {p95 * 1000:7.1f} ms   n={len(ordered):<3}  new connections={connections}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=30)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--connect-ms", type=float, default=60.0)
+    parser.add_argument("--response-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    StubLLMHandler.connect_delay = args.connect_ms / 1000
+    StubLLMHandler.response_delay = args.response_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubLLMHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    endpoint = f"http://{server.server_address[0]}:{server.server_address[1]}"
+
+    def new_pool(pool_size: int) -> LLMClientPool:
+        return LLMClientPool(
+            google_api_key="stub-key",
+            role_models={"triage": STUB_MODEL},
+            transport="rest",
+            pool_size=pool_size,
+            client_options={"api_endpoint": endpoint},
+        )
+
+    def measure(label: str, run: Callable[[], List[float]]) -> None:
+        before = StubLLMHandler.connections
+        latencies = run()
+        _report(label, latencies, StubLLMHandler.connections - before)
+
+    print(
+        f"Stub Gemini API at {endpoint} (connect {args.connect_ms:.0f} ms, "
+        f"response {args.response_ms:.0f} ms)\n"
+    )
+
+    # First call on a freshly built client (as after a deploy), without and with warm-up
+    def cold_calls() -> List[float]:
+        return [_timed(lambda: new_pool(1).for_role("triage").invoke("hi")) for _ in range(5)]
+
+    def warmed_calls() -> List[float]:
+        latencies = []
+        for _ in range(5):
+            pool = new_pool(1)
+            client = pool.for_role("triage")
+            _quiet_warm_up(pool)
+            latencies.append(_timed(lambda: client.invoke("hi")))
+        return latencies
+
+    # warm_up()'s own connections are counted too, so expect one per warmed client
+    measure("first call, no warm-up", cold_calls)
+    measure("first call, after warm-up", warmed_calls)
+
+    # Steady state on one shared client
+    client = new_pool(1).for_role("triage")
+    client.invoke("hi")
+    measure(
+        "sequential, shared client",
+        lambda: [_timed(lambda: client.invoke("hi")) for _ in range(args.calls)],
+    )
+
+    # Concurrent traffic against a pool smaller than, and sized to, the concurrency
+    print()
+    for pool_size in (1, args.concurrency):
+        pool = new_pool(pool_size)
+        client = pool.for_role("triage")
+        assert LLMClientPool.connection_pool_size(client) == pool_size
+        _quiet_warm_up(pool)
+
+        def concurrent_calls() -> List[float]:
+            with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+                return list(
+                    executor.map(
+                        lambda _: _timed(lambda: client.invoke("hi")), range(args.calls)
+                    )
+                )
+
+        concurrent_calls()  # let the pool fill up to its size
+        measure(
+            f"concurrency {args.concurrency}, pool size {pool_size}", concurrent_calls
+        )
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# backend/benchmarks/ticket_journal_bench.py
+"""Measure ticket journal write throughput, lookup latency and replay time.
+
+Writes go to a temporary directory; compare fsync batch sizes with --batches.
+Run from the backend directory:
+
+    python benchmarks/ticket_journal_bench.py [--tickets 5000] [--batches 1 32 256]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from tools.ticket_journal import TicketJournal  # noqa: E402
+
+
+def _create_tickets(journal: TicketJournal, count: int) -> List[str]:
+    ticket_ids = []
+    for i in range(count):
+        ticket, _ = journal.create_ticket(
+            summary=f"Issue {i}: router {i % 97} drops connection after update {i % 13}",
+            email=f"customer{i % 500}@example.com",
+            session_id=f"session-{i}",
+        )
+        ticket_ids.append(ticket["ticket_id"])
+    journal.flush()
+    return ticket_ids
+
+
+def _lookup_latency_us(lookup: Callable[[int], object], count: int) -> List[float]:
+    latencies = []
+    for i in range(count):
+        start = time.perf_counter()
+        lookup(i)
+        latencies.append((time.perf_counter() - start) * 1_000_000)
+    return latencies
+
+
+def _report_lookup(label: str, latencies: List[float]) -> None:
+    ordered = sorted(latencies)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(
+        f"  {label:<26} p50 {statistics.median(ordered):7.2f} us   p99 {p99:7.2f} us"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickets", type=int, default=5000)
+    parser.add_argument("--batches", type=int, nargs="+", default=[1, 32, 256])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        print(f"Write throughput ({args.tickets} tickets):")
+        path = None
+        for batch in args.batches:
+            path = os.path.join(tmp_dir, f"tickets-batch{batch}.jsonl")
+            # Disable time-based fsync so only the batch size decides when to sync
+            journal = TicketJournal(
+                path, fsync_batch=batch, fsync_interval=float("inf"), duplicate_window=0
+            )
+            start = time.perf_counter()
+            ticket_ids = _create_tickets(journal, args.tickets)
+            elapsed = time.perf_counter() - start
+            journal.close()
+            print(
+                f"  fsync every {batch:>4} records   {args.tickets / elapsed:10.0f} tickets/s"
+            )
+
+        start = time.perf_counter()
+        journal = TicketJournal(path)
+        print(
+            f"\nReplay of {args.tickets} tickets: "
+            f"{(time.perf_counter() - start) * 1000:.1f} ms\n"
+        )
+
+        print("Lookup latency:")
+        _report_lookup(
+            "by ticket ID",
+            _lookup_latency_us(lambda i: journal.get(ticket_ids[i]), args.tickets),
+        )
+        _report_lookup(
+            "by email",
+            _lookup_latency_us(
+                lambda i: journal.find_by_email(f"customer{i % 500}@example.com"),
+                args.tickets,
+            ),
+        )
+        _report_lookup(
+            "by session",
+            _lookup_latency_us(
+                lambda i: journal.find_by_session(f"session-{i}"), args.tickets
+            ),
+        )
+        journal.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+# backend/llm_clients.py
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Dict, Optional, Tuple
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_google_genai import ChatGoogleGenerativeAI
+from requests.adapters import HTTPAdapter
+
+# --- Client Configuration ---
+# Triage only classifies and answers FAQs, so it can run on a cheaper, faster model.
+DEFAULT_MODEL = os.getenv("LLM_MODEL", "gemini-2.0-flash")
+ROLE_MODELS: Dict[str, str] = {
+    "triage": os.getenv("TRIAGE_MODEL", "gemini-2.0-flash-lite"),
+    "tech": os.getenv("TECH_MODEL", DEFAULT_MODEL),
+    "billing": os.getenv("BILLING_MODEL", DEFAULT_MODEL),
+}
+LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.7"))
+# "rest" gives us a requests session whose keep-alive pool we can size;
+# "grpc" multiplexes calls over a single HTTP/2 channel instead.
+LLM_TRANSPORT = os.getenv("LLM_TRANSPORT", "rest")
+# Keep-alive connections per client; size this to the expected concurrent requests.
+# Only the rest transport has a pool; unset means DEFAULT_LLM_POOL_SIZE there.
+DEFAULT_LLM_POOL_SIZE = 16
+LLM_POOL_SIZE = int(os.environ["LLM_POOL_SIZE"]) if os.getenv("LLM_POOL_SIZE") else None
+# Re-warm clients idle longer than this many seconds (0 disables periodic warm-up)
+LLM_WARMUP_INTERVAL = float(os.getenv("LLM_WARMUP_INTERVAL", "240"))
+# Upper bound on a warm-up round, so a slow API cannot hold up startup
+LLM_WARMUP_TIMEOUT = float(os.getenv("LLM_WARMUP_TIMEOUT", "10"))
+LLM_WARMUP_PROMPT = "Reply with OK."
+
+
+class _ClientUsageTracker(BaseCallbackHandler):
+    """Records when a client was last used and how long its calls take."""
+
+    def __init__(self):
+        self.last_used: float = 0.0
+        self.calls: int = 0
+        self.total_seconds: float = 0.0
+        self.last_call_seconds: float = 0.0
+        self._started: Dict[Any, float] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._started[run_id] = time.perf_counter()
+        self.last_used = time.time()
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._record(run_id)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._record(run_id)
+
+    def _record(self, run_id) -> None:
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            self.last_call_seconds = time.perf_counter() - started
+            self.total_seconds += self.last_call_seconds
+            self.calls += 1
+        self.last_used = time.time()
+
+
+class LLMClientPool:
+    """Builds one warm, keep-alive chat client per model and shares it across agents."""
+
+    def __init__(
+        self,
+        google_api_key: str,
+        role_models: Optional[Dict[str, str]] = None,
+        temperature: float = LLM_TEMPERATURE,
+        transport: str = LLM_TRANSPORT,
+        pool_size: Optional[int] = None,
+        client_options: Optional[Dict[str, Any]] = None,
+    ):
+        if pool_size is None:
+            pool_size = LLM_POOL_SIZE
+        if transport != "rest" and pool_size is not None:
+            raise ValueError(
+                f"pool_size (LLM_POOL_SIZE) only applies to the rest transport, "
+                f"not {transport!r}."
+            )
+        if transport == "rest" and pool_size is None:
+            pool_size = DEFAULT_LLM_POOL_SIZE
+        self.google_api_key = google_api_key
+        self.role_models = dict(ROLE_MODELS if role_models is None else role_models)
+        self.temperature = temperature
+        self.transport = transport
+        self.pool_size = pool_size
+        # e.g. {"api_endpoint": "http://127.0.0.1:8080"} to target a stub server
+        self.client_options = client_options
+        self._clients: Dict[Tuple[str, float], ChatGoogleGenerativeAI] = {}
+        self._trackers: Dict[Tuple[str, float], _ClientUsageTracker] = {}
+
+    def for_role(self, role: str) -> ChatGoogleGenerativeAI:
+        """Return the shared client for an agent role ("triage", "tech", "billing")."""
+        return self.get(self.role_models.get(role, DEFAULT_MODEL))
+
+    def get(self, model: str) -> ChatGoogleGenerativeAI:
+        key = (model, self.temperature)
+        if key not in self._clients:
+            tracker = _ClientUsageTracker()
+            client = ChatGoogleGenerativeAI(
+                model=model,
+                google_api_key=self.google_api_key,
+                temperature=self.temperature,
+                convert_system_message_to_human=True,  # Important for Gemini
+                transport=self.transport,
+                client_options=self.client_options,
+                callbacks=[tracker],
+            )
+            self._size_connection_pool(client)
+            self._clients[key] = client
+            self._trackers[key] = tracker
+        return self._clients[key]
+
+    def _size_connection_pool(self, client: ChatGoogleGenerativeAI) -> None:
+        if self.transport != "rest":
+            return
+        # The REST transport keeps a requests session (keep-alive by default), but
+        # its adapter only pools 10 connections; mount one sized to our concurrency.
+        # This relies on the transport layout of the pinned langchain-google-genai.
+        session = getattr(getattr(client.client, "_transport", None), "_session", None)
+        if session is None or not hasattr(session, "mount"):
+            raise RuntimeError(
+                "Could not apply LLM_POOL_SIZE: the installed langchain-google-genai "
+                "REST transport has no requests session. Check the pinned version in "
+                "requirements.txt."
+            )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+    @staticmethod
+    def connection_pool_size(client: ChatGoogleGenerativeAI) -> int:
+        """Max keep-alive connections the client's REST session holds per host."""
+        session = client.client._transport._session
+        return session.get_adapter("https://").poolmanager.connection_pool_kw["maxsize"]
+
+    def warm_up(
+        self, max_idle: float = 0.0, timeout: float = LLM_WARMUP_TIMEOUT
+    ) -> Dict[str, float]:
+        """Send a tiny request on every client idle longer than `max_idle` seconds,
+        so connection setup and TLS happen before a customer is waiting.
+        Clients are warmed in parallel and the round gives up after `timeout` seconds.
+        Returns the warm-up latency per model that finished in time."""
+        now = time.time()
+        idle = []
+        for (model, _), client in list(self._clients.items()):
+            last_used = self._trackers[(model, self.temperature)].last_used
+            if last_used and now - last_used < max_idle:
+                continue
+            idle.append((model, client))
+        if not idle:
+            return {}
+
+        def _warm(client: ChatGoogleGenerativeAI) -> float:
+            start = time.perf_counter()
+            client.invoke(LLM_WARMUP_PROMPT)
+            return time.perf_counter() - start
+
+        executor = ThreadPoolExecutor(max_workers=len(idle))
+        futures = {executor.submit(_warm, client): model for model, client in idle}
+        done, pending = wait(futures, timeout=timeout)
+        # Don't wait for stragglers; their requests finish (or fail) in the background
+        executor.shutdown(wait=False)
+
+        latencies = {}
+        for future in done:
+            model = futures[future]
+            try:
+                latencies[model] = future.result()
+            except Exception as e:
+                print(f"LLM warm-up failed for {model}: {e}")
+                continue
+            print(f"Warmed up LLM client {model} in {latencies[model] * 1000:.0f} ms")
+        for future in pending:
+            print(f"LLM warm-up for {futures[future]} timed out after {timeout:.0f} s")
+        return latencies
+
+    async def run_periodic_warm_up(self, interval: float = LLM_WARMUP_INTERVAL) -> None:
+        """Keep idle clients' connections warm; intended to run as a background task."""
+        if interval <= 0:
+            return
+        while True:
+            await asyncio.sleep(interval)
+            await asyncio.get_running_loop().run_in_executor(
+                None, self.warm_up, interval
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "transport": self.transport,
+            "pool_size": self.pool_size,
+            "role_models": self.role_models,
+            "clients": {
+                model: {
+                    "calls": tracker.calls,
+                    "last_call_seconds": tracker.last_call_seconds,
+                    "avg_call_seconds": (
+                        tracker.total_seconds / tracker.calls if tracker.calls else 0.0
+                    ),
+                    "last_used": tracker.last_used,
+                }
+                for (model, _), tracker in self._trackers.items()
+            },
+        }
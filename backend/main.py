@@ -1,4 +1,5 @@
 # backend/main.py (Updated orchestration logic)
+import asyncio
 import os
 import re
 import time
@@ -11,6 +12,22 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 
+from tools.tenant_kb import (
+    DEFAULT_TENANT,
+    UnknownTenantError,
+    get_active_tenant,
+    tenant_knowledge_bases,
+    use_tenant,
+)
+from tools.ticket_journal import (
+    TICKET_ID_PATTERN,
+    format_ticket_status,
+    get_active_session_id,
+    ticket_journal,
+    use_ticket_session,
+)
+from tools.tool_cache import ToolResultCache, get_active_tool_cache, use_tool_cache
+
 
 # Session management class
 class UserSession:
@@ -19,6 +36,8 @@ class UserSession:
         self.escalation_summary: Optional[str] = None
         self.original_query: Optional[str] = None
         self.last_interaction: float = time.time()
+        self.tenant_id: str = DEFAULT_TENANT
+        self.tool_cache: ToolResultCache = ToolResultCache()
 
 
 # Session storage
@@ -47,16 +66,26 @@ def get_user_session(session_id: str) -> UserSession:
     return _user_sessions[session_id]
 
 
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage, AIMessage
 
 # Import agent creation functions
 from agents.triage_agent import create_triage_agent
 from agents.tech_agent import create_tech_agent
 from agents.billing_agent import create_billing_agent
+from agents.triage_classifier import (
+    TRIAGE_CLASSIFIER_THRESHOLD,
+    load_latest_triage_classifier,
+    log_routing_decision,
+)
+
+from llm_clients import LLMClientPool
 
 # Import the *direct* function for orchestration, not the tool object
-from tools.knowledge_base_tools import direct_escalate_to_human
+from tools.knowledge_base_tools import (
+    FAQ_NOT_FOUND_ANSWER,
+    direct_escalate_to_human,
+    get_faq_answer,
+)
 
 # Load environment variables from .env file
 load_dotenv()
@@ -92,28 +121,70 @@ _waiting_for_email: bool = False
 _escalation_summary_context: Optional[str] = None
 _original_query_context: Optional[str] = None
 
-# Initialize the LLM with proper configuration
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.0-flash",  # Replace with a valid model name
-    google_api_key=GOOGLE_API_KEY,
-    temperature=0.7,
-    convert_system_message_to_human=True,  # Important for Gemini
-)
+# Initialize the shared LLM clients (one pooled, keep-alive client per model)
+llm_clients = LLMClientPool(google_api_key=GOOGLE_API_KEY)
 
 try:
     # Initialize agents
-    triage_agent_executor = create_triage_agent(llm)
-    tech_agent_executor = create_tech_agent(llm)
-    billing_agent_executor = create_billing_agent(llm)
+    triage_agent_executor = create_triage_agent(llm_clients.for_role("triage"))
+    tech_agent_executor = create_tech_agent(llm_clients.for_role("tech"))
+    billing_agent_executor = create_billing_agent(llm_clients.for_role("billing"))
 except Exception as e:
     print(f"Error initializing agents: {str(e)}")
     raise
 
+# Learned triage classifier; confident predictions skip the LLM triage agent
+triage_classifier = load_latest_triage_classifier()
+if triage_classifier is not None:
+    print(f"Loaded triage classifier v{triage_classifier.version}")
+
+_triage_stats: Dict[str, float] = {
+    "classifier_bypasses": 0,
+    "llm_calls": 0,
+    "classifier_seconds": 0.0,
+    "llm_seconds": 0.0,
+}
+
+
+@app.on_event("startup")
+async def warm_up_llm_clients():
+    """Open LLM connections before the first customer request, then keep them warm."""
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, llm_clients.warm_up)
+    app.state.llm_warm_up_task = asyncio.create_task(
+        llm_clients.run_periodic_warm_up()
+    )
+
+
+@app.on_event("startup")
+async def start_ticket_journal_flush():
+    """Fsync ticket records that a quiet period would otherwise leave pending."""
+    app.state.ticket_flush_task = asyncio.create_task(
+        ticket_journal.run_periodic_flush()
+    )
+
+
+@app.on_event("shutdown")
+async def stop_llm_warm_up():
+    task = getattr(app.state, "llm_warm_up_task", None)
+    if task is not None:
+        task.cancel()
+
+
+@app.on_event("shutdown")
+async def close_ticket_journal():
+    task = getattr(app.state, "ticket_flush_task", None)
+    if task is not None:
+        task.cancel()
+    ticket_journal.close()
+
 
 # Pydantic model for incoming chat requests
 class ChatRequest(BaseModel):
     message: str
     chat_history: List[Dict[str, str]] = []
+    session_id: Optional[str] = None
+    tenant_id: Optional[str] = None
 
 
 # Helper function to convert chat history to LangChain message format
@@ -148,6 +219,105 @@ def _extract_context_from_history(chat_history: List[Dict[str, str]]) -> str:
     return " | ".join(context_parts)
 
 
+# Phrases indicating the customer just paid, which makes cached billing data stale
+_PAYMENT_PHRASES = [
+    "i paid",
+    "i've paid",
+    "just paid",
+    "made a payment",
+    "payment made",
+    "payment done",
+]
+
+# Phrases that, together with "ticket" (or a ticket ID), ask for a ticket's status
+_TICKET_STATUS_PHRASES = ["status", "progress", "any update", "any news"]
+
+
+def answer_ticket_status_query(query: str) -> Optional[str]:
+    """Answer "what's my ticket status" from the ticket journal, without the LLM.
+    Only tickets this chat session may see (see TicketJournal.find_for_session) are
+    reported, so emails or ticket IDs typed into the chat never reveal other
+    customers' tickets. Returns None if the query is not a ticket status question,
+    e.g. "my app won't update, can you open a ticket?", so it reaches triage."""
+    query_lower = query.lower()
+    # Ticket IDs are issued uppercase; accept them typed in any case
+    ticket_ids = TICKET_ID_PATTERN.findall(query.upper())
+    if "ticket" not in query_lower or not (
+        ticket_ids or any(phrase in query_lower for phrase in _TICKET_STATUS_PHRASES)
+    ):
+        return None
+
+    session_id, tenant_id = get_active_session_id(), get_active_tenant()
+    visible = ticket_journal.find_for_session(session_id, tenant_id) if session_id else []
+    if ticket_ids:
+        visible_by_id = {ticket["ticket_id"]: ticket for ticket in visible}
+        return "\n".join(
+            format_ticket_status(visible_by_id[ticket_id])
+            if ticket_id in visible_by_id
+            else f"I couldn't find ticket {ticket_id} in this conversation."
+            for ticket_id in ticket_ids
+        )
+    if visible:
+        return "\n".join(format_ticket_status(ticket) for ticket in visible[-3:])
+    return "I don't see any support tickets from this conversation. For an earlier ticket, please reply to its confirmation email and our team will update you."
+
+
+def classify_without_llm(query: str) -> Optional[str]:
+    """Triage with the learned classifier. Returns triage output in the LLM agent's
+    format ("ROUTE_TECH: ...", "ROUTE_BILLING: ..." or an FAQ answer), or None
+    when the classifier is missing or not confident enough."""
+    if triage_classifier is None:
+        return None
+    start = time.perf_counter()
+    prediction = triage_classifier.predict_if_confident(query, TRIAGE_CLASSIFIER_THRESHOLD)
+    _triage_stats["classifier_seconds"] += time.perf_counter() - start
+    if prediction is None:
+        return None
+
+    route, confidence = prediction
+    print(f"Triage Classifier: {route} ({confidence:.2f}), skipping triage agent")
+    if route == "TECH":
+        return f"ROUTE_TECH: {query}"
+    if route == "BILLING":
+        return f"ROUTE_BILLING: {query}"
+    faq_answer = get_faq_answer.invoke(query)
+    # No FAQ entry matched: let the triage agent decide instead
+    return None if faq_answer == FAQ_NOT_FOUND_ANSWER else faq_answer
+
+
+def invoke_with_cached_tool_context(
+    agent_executor: Any,
+    enhanced_query: str,
+    formatted_history: List[Any],
+    tool_name: str,
+    cache_key: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Invoke a specialist agent. If the session cache holds a still-valid result for
+    this exact tool call (`cache_key` is the customer ID or the user's issue), offer it
+    as context so the agent can answer without another tool-calling iteration."""
+    cache = get_active_tool_cache()
+    if cache is None:
+        return agent_executor.invoke(
+            {"input": enhanced_query, "chat_history": formatted_history}
+        )
+
+    cached_context = cache.context_for(tool_name, cache_key) if cache_key else ""
+    if cached_context:
+        enhanced_query = (
+            f"{enhanced_query}\nCached `{tool_name}` result for this same request from "
+            f"earlier in this conversation (still current, use it instead of calling "
+            f"the tool again): {cached_context}"
+        )
+    cache.begin_turn()
+    result = agent_executor.invoke(
+        {"input": enhanced_query, "chat_history": formatted_history}
+    )
+    cache.end_turn(
+        offered_context=bool(cached_context), response=result["output"].strip()
+    )
+    return result
+
+
 # Helper function to handle billing queries
 async def handle_billing_query(
     query: str, formatted_history: List[Any], customer_id: Optional[str] = None
@@ -164,8 +334,12 @@ async def handle_billing_query(
             enhanced_query = f"Process this billing query for {customer_id}: {query}"
 
     print(f"Processing billing query: {enhanced_query}")
-    billing_result = billing_agent_executor.invoke(
-        {"input": enhanced_query, "chat_history": formatted_history}
+    billing_result = invoke_with_cached_tool_context(
+        billing_agent_executor,
+        enhanced_query,
+        formatted_history,
+        "get_billing_info",
+        customer_id,
     )
     return billing_result["output"].strip()
 
@@ -180,6 +354,15 @@ async def handle_customer_query_backend(
     response = ""
     extracted_email = extract_email(query)  # Try to extract email from current turn
 
+    # --- Invalidate Cached Billing Data After a Payment ---
+    if any(phrase in query.lower() for phrase in _PAYMENT_PHRASES):
+        session.tool_cache.notify("payment")
+
+    # --- Ticket Status Lookup (answered from the journal, no LLM call) ---
+    ticket_status = answer_ticket_status_query(query)
+    if ticket_status is not None:
+        return ticket_status
+
     # --- Direct Human Escalation Request ---
     if any(
         phrase in query.lower()
@@ -229,11 +412,27 @@ async def handle_customer_query_backend(
             return "I'm still waiting for your email address to escalate this. Could you please provide it?"
 
     # --- Initial Query Processing (Triage) ---
-    print("Triage Agent: Analyzing query intent...")
-    triage_result = triage_agent_executor.invoke(
-        {"input": query, "chat_history": formatted_history}
-    )
-    triage_output = triage_result["output"].strip()
+    triage_output = classify_without_llm(query)
+    triage_source, triage_seconds, llm_route = "classifier", None, None
+    if triage_output is not None:
+        _triage_stats["classifier_bypasses"] += 1
+    else:
+        print("Triage Agent: Analyzing query intent...")
+        start = time.perf_counter()
+        triage_result = triage_agent_executor.invoke(
+            {"input": query, "chat_history": formatted_history}
+        )
+        triage_seconds = time.perf_counter() - start
+        triage_source = "llm"
+        _triage_stats["llm_calls"] += 1
+        _triage_stats["llm_seconds"] += triage_seconds
+        triage_output = triage_result["output"].strip()
+        # The agent's own decision, before the overrides below; logged for evaluation
+        llm_route = (
+            "TECH"
+            if "ROUTE_TECH:" in triage_output
+            else "BILLING" if "ROUTE_BILLING:" in triage_output else "FAQ"
+        )
     print(f"Triage Agent Output: {triage_output}")
 
     # Process triage output and determine routing
@@ -245,6 +444,7 @@ async def handle_customer_query_backend(
         print("Direct billing route: Customer ID detected")
         # Normalize customer ID format
         customer_id = f"customer_{customer_id_match.group(1)}"
+        log_routing_decision(query, "BILLING", triage_source, triage_seconds, llm_route)
         # Route directly to billing agent
         return await handle_billing_query(query, formatted_history, customer_id)
 
@@ -270,8 +470,11 @@ async def handle_customer_query_backend(
             print("Billing route: Keywords detected")
             route_to = "BILLING"
         else:
+            log_routing_decision(query, "FAQ", triage_source, triage_seconds, llm_route)
             return triage_output  # FAQ response
 
+    log_routing_decision(query, route_to, triage_source, triage_seconds, llm_route)
+
     # Store the cleaned context for routing
     context = cleaned_triage_output
 
@@ -316,8 +519,12 @@ async def handle_customer_query_backend(
         print("Orchestrator: Routing to Technical Support Agent.")
         # Add context to the query for the technical agent
         enhanced_query = f"{query}\nContext: {context}" if context else query
-        tech_result = tech_agent_executor.invoke(
-            {"input": enhanced_query, "chat_history": formatted_history}
+        tech_result = invoke_with_cached_tool_context(
+            tech_agent_executor,
+            enhanced_query,
+            formatted_history,
+            "get_tech_solution",
+            query,
         )
         technical_response = tech_result["output"].strip()
 
@@ -335,8 +542,11 @@ async def handle_customer_query_backend(
         print("Orchestrator: Routing to Billing Agent.")
         # Add context to the query for the billing agent
         enhanced_query = f"{query}\nContext: {context}" if context else query
-        billing_result = billing_agent_executor.invoke(
-            {"input": enhanced_query, "chat_history": formatted_history}
+        billing_result = invoke_with_cached_tool_context(
+            billing_agent_executor,
+            enhanced_query,
+            formatted_history,
+            "get_billing_info",
         )
         billing_response = billing_result["output"].strip()
 
@@ -356,20 +566,38 @@ async def handle_customer_query_backend(
 @app.post("/chat")
 async def chat_endpoint(request: ChatRequest):
     """Handle incoming chat requests with session management."""
+    tenant_id = request.tenant_id or DEFAULT_TENANT
+    try:
+        # Load (or reuse) the tenant's knowledge base before any agent runs
+        tenant_knowledge_bases.get(tenant_id)
+    except UnknownTenantError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
     try:
         # Generate a session ID if not provided
-        session_id = getattr(request, "session_id", None) or str(uuid4())
+        session_id = request.session_id or str(uuid4())
         session = get_user_session(session_id)
-
-        # Process the query
-        agent_response = await handle_customer_query_backend(
-            query=request.message,
-            raw_chat_history=request.chat_history,
-            session=session,
-        )
+        if session.tenant_id != tenant_id:
+            # Cached tool results belong to the previous tenant's data
+            session.tenant_id = tenant_id
+            session.tool_cache = ToolResultCache()
+
+        # Process the query against the tenant's knowledge base,
+        # memoizing tool results for this session
+        with use_tenant(tenant_id), use_tool_cache(
+            session.tool_cache
+        ), use_ticket_session(session_id):
+            agent_response = await handle_customer_query_backend(
+                query=request.message,
+                raw_chat_history=request.chat_history,
+                session=session,
+            )
 
         # Log successful interaction
-        print(f"Chat processed successfully - Session: {session_id[:8]}")
+        print(
+            f"Chat processed successfully - Session: {session_id[:8]} "
+            f"- Tool cache: {session.tool_cache.stats()}"
+        )
 
         return {
             "response": agent_response,
@@ -388,6 +616,70 @@ async def chat_endpoint(request: ChatRequest):
         )
 
 
+@app.get("/sessions/{session_id}/tool-stats")
+async def session_tool_stats(session_id: str):
+    """Report tool calls and agent iterations saved by the session's tool cache."""
+    session = _user_sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found.")
+    return {"session_id": session_id, **session.tool_cache.stats()}
+
+
+@app.get("/stats/tenants")
+async def tenant_stats():
+    """Report resident tenant knowledge bases, per-tenant load times and evictions."""
+    return tenant_knowledge_bases.stats()
+
+
+@app.get("/tickets/{ticket_id}")
+async def get_ticket(ticket_id: str, session_id: str, tenant_id: str = DEFAULT_TENANT):
+    """Look up a support ticket by its ID, if the chat session may see it."""
+    ticket = ticket_journal.get_for_session(ticket_id.upper(), session_id, tenant_id)
+    if ticket is None:
+        raise HTTPException(status_code=404, detail="Ticket not found.")
+    return ticket
+
+
+@app.get("/tickets")
+async def list_tickets(session_id: str, tenant_id: str = DEFAULT_TENANT):
+    """List the support tickets a chat session may see."""
+    return ticket_journal.find_for_session(session_id, tenant_id)
+
+
+@app.get("/stats/tickets")
+async def ticket_stats():
+    """Report ticket journal size, pending fsyncs and suppressed duplicate escalations."""
+    return ticket_journal.stats()
+
+
+@app.get("/stats/triage")
+async def triage_stats():
+    """Report how often the learned classifier bypassed the LLM triage agent."""
+    classified = _triage_stats["classifier_bypasses"] + _triage_stats["llm_calls"]
+    return {
+        "classifier_version": triage_classifier.version if triage_classifier else None,
+        "threshold": TRIAGE_CLASSIFIER_THRESHOLD,
+        "classifier_bypasses": _triage_stats["classifier_bypasses"],
+        "llm_calls": _triage_stats["llm_calls"],
+        "avg_classifier_us": (
+            _triage_stats["classifier_seconds"] / classified * 1_000_000
+            if triage_classifier and classified
+            else 0.0
+        ),
+        "avg_llm_triage_ms": (
+            _triage_stats["llm_seconds"] / _triage_stats["llm_calls"] * 1000
+            if _triage_stats["llm_calls"]
+            else 0.0
+        ),
+    }
+
+
+@app.get("/stats/llm")
+async def llm_stats():
+    """Report per-model LLM client configuration and call latencies."""
+    return llm_clients.stats()
+
+
 @app.get("/")
 async def root():
     return {"message": "AI Customer Support Backend is running!"}
@@ -0,0 +1,221 @@
+# backend/scripts/train_triage_classifier.py
+"""Train a versioned triage classifier from logged routing decisions and report
+how it compares with the LLM triage agent.
+
+Training data is one or more JSON-lines files of (query, route) pairs, e.g. the
+production routing log (data/routing_log.jsonl) or a labelled requests.jsonl.
+Labels are final routes, after keyword and customer ID overrides. Where the log
+also has the LLM triage agent's own route ("llm_route"), the report compares the
+classifier with it separately. Run from the backend directory:
+
+    python scripts/train_triage_classifier.py data/routing_log.jsonl [more.jsonl ...]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from agents.triage_classifier import (  # noqa: E402
+    DEFAULT_N_FEATURES,
+    MODEL_DIR,
+    ROUTES,
+    TRIAGE_CLASSIFIER_THRESHOLD,
+    TriageClassifier,
+    artifact_path,
+    dedupe_routing_records,
+    latest_artifact_version,
+    load_routing_records,
+    split_routing_records,
+    train_triage_classifier,
+)
+
+
+def _examples(records: Sequence[Dict[str, Any]]) -> List[Tuple[str, str]]:
+    return [(record["query"], record["route"]) for record in records]
+
+
+def _accuracy(predicted: Sequence[str], labels: Sequence[Optional[str]]) -> Optional[float]:
+    """Share of predictions matching their label, over records that have one."""
+    pairs = [(pred, label) for pred, label in zip(predicted, labels) if label]
+    return sum(pred == label for pred, label in pairs) / len(pairs) if pairs else None
+
+
+def _mean_llm_latency_ms(paths: Sequence[str]) -> float:
+    """Mean latency of LLM triage calls recorded in the routing log(s), if any."""
+    latencies = []
+    for path in paths:
+        with open(path, "r") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get("source") == "llm" and record.get("latency_ms"):
+                    latencies.append(record["latency_ms"])
+    return statistics.mean(latencies) if latencies else 0.0
+
+
+def evaluate(
+    classifier: TriageClassifier,
+    records: Sequence[Dict[str, Any]],
+    threshold: float,
+    llm_latency_ms: float,
+    llm_cost_per_call: float,
+) -> Dict:
+    """Compare classifier predictions with the final routes and, where logged,
+    with the LLM triage agent's own routes."""
+    examples = _examples(records)
+    predictions, latencies_us = [], []
+    for query, _ in examples:
+        start = time.perf_counter()
+        predictions.append(classifier.predict(query))
+        latencies_us.append((time.perf_counter() - start) * 1_000_000)
+
+    predicted_routes = [pred for pred, _ in predictions]
+    llm_routes = [record["llm_route"] for record in records]
+    correct = [pred == route for pred, (_, route) in zip(predicted_routes, examples)]
+    confident = [conf >= threshold for _, conf in predictions]
+    bypassed_correct = [c for c, conf in zip(correct, confident) if conf]
+    coverage = sum(confident) / len(examples)
+
+    per_route = {}
+    for route in ROUTES:
+        predicted = [pred == route for pred, _ in predictions]
+        actual = [label == route for _, label in examples]
+        true_pos = sum(p and a for p, a in zip(predicted, actual))
+        per_route[route] = {
+            "support": sum(actual),
+            "precision": true_pos / sum(predicted) if sum(predicted) else 0.0,
+            "recall": true_pos / sum(actual) if sum(actual) else 0.0,
+        }
+
+    return {
+        "examples": len(examples),
+        "accuracy_vs_final_route": sum(correct) / len(examples),
+        "llm_router_examples": sum(1 for route in llm_routes if route),
+        "accuracy_vs_llm_router": _accuracy(predicted_routes, llm_routes),
+        "threshold": threshold,
+        "coverage": coverage,
+        "accuracy_when_bypassing": (
+            sum(bypassed_correct) / len(bypassed_correct) if bypassed_correct else 0.0
+        ),
+        "per_route": per_route,
+        "classifier_latency_us_p50": statistics.median(latencies_us),
+        "llm_triage_latency_ms": llm_latency_ms,
+        "latency_saved_ms_per_query": coverage * llm_latency_ms,
+        "llm_calls_saved_per_1000_queries": coverage * 1000,
+        "cost_saved_per_1000_queries": coverage * 1000 * llm_cost_per_call,
+    }
+
+
+def _print_report(report: Dict, version: int, path: str) -> None:
+    print(f"\nTriage classifier v{version} -> {path}")
+    print(f"  holdout examples          {report['examples']}")
+    print(f"  accuracy vs final route   {report['accuracy_vs_final_route']:.1%}")
+    if report["accuracy_vs_llm_router"] is not None:
+        print(
+            f"  accuracy vs LLM router    {report['accuracy_vs_llm_router']:.1%} "
+            f"(n={report['llm_router_examples']})"
+        )
+    else:
+        print("  accuracy vs LLM router    n/a (no llm_route in the data)")
+    bypass_label = f"bypass at p>={report['threshold']:.2f}"
+    print(
+        f"  {bypass_label:<26}{report['coverage']:.1%} of queries, "
+        f"{report['accuracy_when_bypassing']:.1%} accurate"
+    )
+    for route, scores in report["per_route"].items():
+        print(
+            f"    {route:<8} precision {scores['precision']:.1%}  "
+            f"recall {scores['recall']:.1%}  (n={scores['support']})"
+        )
+    print(f"  classifier latency p50    {report['classifier_latency_us_p50']:.1f} us")
+    if report["llm_triage_latency_ms"]:
+        print(
+            f"  LLM triage latency        {report['llm_triage_latency_ms']:.0f} ms "
+            f"(saves {report['latency_saved_ms_per_query']:.0f} ms/query on average)"
+        )
+    print(
+        f"  LLM triage calls saved    {report['llm_calls_saved_per_1000_queries']:.0f} per 1000 queries"
+        f" (cost saved {report['cost_saved_per_1000_queries']:.4f})"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("data", nargs="+", help="JSON-lines files of (query, route) pairs")
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--n-features", type=int, default=DEFAULT_N_FEATURES)
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--holdout", type=float, default=0.2)
+    parser.add_argument("--threshold", type=float, default=TRIAGE_CLASSIFIER_THRESHOLD)
+    parser.add_argument(
+        "--llm-latency-ms",
+        type=float,
+        default=None,
+        help="LLM triage latency; defaults to the mean logged latency",
+    )
+    parser.add_argument("--llm-cost-per-call", type=float, default=0.0)
+    parser.add_argument(
+        "--split",
+        choices=("random", "time"),
+        default="random",
+        help="hold out a random sample, or the most recently logged examples",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    loaded = load_routing_records(args.data)
+    records = dedupe_routing_records(loaded)
+    if len(records) < 10:
+        sys.exit(f"Need at least 10 distinct labelled queries, found {len(records)}.")
+    print(
+        f"Loaded {len(loaded)} examples, {len(records)} distinct queries: "
+        f"{dict(Counter(record['route'] for record in records))}"
+    )
+
+    train, test = split_routing_records(
+        records, args.holdout, args.seed, by_time=args.split == "time"
+    )
+    llm_latency_ms = (
+        args.llm_latency_ms
+        if args.llm_latency_ms is not None
+        else _mean_llm_latency_ms(args.data)
+    )
+    report = evaluate(
+        train_triage_classifier(
+            _examples(train), args.n_features, args.epochs, seed=args.seed
+        ),
+        test,
+        args.threshold,
+        llm_latency_ms,
+        args.llm_cost_per_call,
+    )
+
+    # Ship a model trained on all examples; the holdout report estimates its quality
+    classifier = train_triage_classifier(
+        _examples(records), args.n_features, args.epochs, seed=args.seed
+    )
+    classifier.version = latest_artifact_version(args.model_dir) + 1
+    classifier.metadata = {
+        "trained_at": time.time(),
+        "training_examples": len(records),
+        "split": args.split,
+        "sources": args.data,
+        "evaluation": report,
+    }
+    path = artifact_path(classifier.version, args.model_dir)
+    classifier.save(path)
+    with open(path.replace(".npz", ".report.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    _print_report(report, classifier.version, path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+# backend/tests/conftest.py
+import os
+import sys
+
+# Tests import modules the way main.py does ("from tools...", "from agents...")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
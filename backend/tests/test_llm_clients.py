@@ -0,0 +1,103 @@
+# backend/tests/test_llm_clients.py
+import json
+import threading
+import time
+import warnings
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("langchain_google_genai")
+warnings.simplefilter("ignore")
+
+import llm_clients  # noqa: E402
+from llm_clients import DEFAULT_LLM_POOL_SIZE, LLMClientPool  # noqa: E402
+
+STUB_RESPONSE = json.dumps(
+    {"candidates": [{"content": {"parts": [{"text": "OK"}], "role": "model"}}]}
+).encode()
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    delay = 0.0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.delay)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(STUB_RESPONSE)))
+        self.end_headers()
+        self.wfile.write(STUB_RESPONSE)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_endpoint():
+    _StubHandler.delay = 0.0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def _pool(endpoint, **kwargs):
+    return LLMClientPool(
+        google_api_key="stub-key",
+        role_models={"triage": "stub-fast", "tech": "stub-main", "billing": "stub-main"},
+        transport="rest",
+        client_options={"api_endpoint": endpoint},
+        **kwargs,
+    )
+
+
+def test_roles_share_one_client_per_model(stub_endpoint):
+    pool = _pool(stub_endpoint)
+    assert pool.for_role("tech") is pool.for_role("billing")
+    assert pool.for_role("triage") is not pool.for_role("tech")
+
+
+def test_connection_pool_is_sized(stub_endpoint):
+    client = _pool(stub_endpoint, pool_size=5).for_role("triage")
+    assert LLMClientPool.connection_pool_size(client) == 5
+    session = client.client._transport._session
+    assert session.get_adapter("http://") is session.get_adapter("https://")
+
+
+def test_pool_size_defaults(stub_endpoint, monkeypatch):
+    monkeypatch.setattr(llm_clients, "LLM_POOL_SIZE", None)
+    assert _pool(stub_endpoint).pool_size == DEFAULT_LLM_POOL_SIZE
+    assert LLMClientPool(google_api_key="stub-key", transport="grpc").pool_size is None
+    monkeypatch.setattr(llm_clients, "LLM_POOL_SIZE", 8)
+    assert _pool(stub_endpoint).pool_size == 8
+
+
+def test_pool_size_with_grpc_fails_loudly(monkeypatch):
+    monkeypatch.setattr(llm_clients, "LLM_POOL_SIZE", None)
+    with pytest.raises(ValueError):
+        LLMClientPool(google_api_key="stub-key", transport="grpc", pool_size=8)
+    # Set through the environment (read into LLM_POOL_SIZE at import)
+    monkeypatch.setattr(llm_clients, "LLM_POOL_SIZE", 8)
+    with pytest.raises(ValueError):
+        LLMClientPool(google_api_key="stub-key", transport="grpc")
+
+
+def test_warm_up_calls_stub(stub_endpoint):
+    pool = _pool(stub_endpoint)
+    pool.for_role("triage")
+    assert set(pool.warm_up()) == {"stub-fast"}
+    assert pool.stats()["clients"]["stub-fast"]["calls"] == 1
+    # Recently used clients are skipped by periodic warm-ups
+    assert pool.warm_up(max_idle=60) == {}
+
+
+def test_warm_up_is_bounded_by_timeout(stub_endpoint):
+    _StubHandler.delay = 2.0
+    pool = _pool(stub_endpoint)
+    pool.for_role("triage")
+    start = time.perf_counter()
+    assert pool.warm_up(timeout=0.2) == {}
+    assert time.perf_counter() - start < 1.0
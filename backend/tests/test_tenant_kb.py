@@ -0,0 +1,85 @@
+# backend/tests/test_tenant_kb.py
+import json
+
+import pytest
+
+from tools.tenant_kb import (
+    BILLING_FILE,
+    DEFAULT_TENANT,
+    FAQ_FILE,
+    TECH_FILE,
+    TenantKnowledgeBaseRegistry,
+    UnknownTenantError,
+    get_active_knowledge_base,
+    get_active_tenant,
+    use_tenant,
+)
+
+
+def _write_tenant(root, tenant_id, brand):
+    tenant_dir = root / tenant_id
+    tenant_dir.mkdir()
+    (tenant_dir / FAQ_FILE).write_text(json.dumps({"what are your hours": f"{brand} hours"}))
+    (tenant_dir / TECH_FILE).write_text(json.dumps({"app crashing": f"{brand} fix"}))
+    (tenant_dir / BILLING_FILE).write_text(json.dumps({"customer_1": {"name": brand}}))
+
+
+@pytest.fixture
+def tenants_dir(tmp_path):
+    for tenant_id in ("acme", "globex", "initech"):
+        _write_tenant(tmp_path, tenant_id, tenant_id.title())
+    return tmp_path
+
+
+def test_loads_lazily_and_reuses_resident_kb(tenants_dir):
+    registry = TenantKnowledgeBaseRegistry(tenants_dir=str(tenants_dir))
+    assert registry.stats()["tenants"] == {}
+    kb = registry.get("acme")
+    assert registry.get("acme") is kb
+    assert kb.billing["customer_1"]["name"] == "Acme"
+    assert kb.faq_index[0][1] == {"what", "are", "your", "hours"}
+    assert registry.stats()["tenants"]["acme"]["loads"] == 1
+
+
+def test_evicts_least_recently_used_over_budget(tenants_dir):
+    registry = TenantKnowledgeBaseRegistry(tenants_dir=str(tenants_dir))
+    size = registry.get("acme").size_bytes
+    registry.max_bytes = size * 2 + size // 2  # room for two tenants
+
+    registry.get("globex")
+    registry.get("acme")  # acme is now most recently used
+    registry.get("initech")
+
+    stats = registry.stats()
+    assert stats["resident_tenants"] == ["acme", "initech"]
+    assert stats["tenants"]["globex"]["evictions"] == 1
+    assert stats["resident_bytes"] <= registry.max_bytes
+
+    registry.get("globex")
+    assert registry.stats()["tenants"]["globex"]["loads"] == 2
+
+
+def test_keeps_single_tenant_larger_than_budget(tenants_dir):
+    registry = TenantKnowledgeBaseRegistry(max_bytes=1, tenants_dir=str(tenants_dir))
+    registry.get("acme")
+    assert registry.stats()["resident_tenants"] == ["acme"]
+
+
+@pytest.mark.parametrize("tenant_id", ["missing", "../acme", "acme/../globex", ""])
+def test_rejects_unknown_or_unsafe_tenants(tenants_dir, tenant_id):
+    registry = TenantKnowledgeBaseRegistry(tenants_dir=str(tenants_dir))
+    with pytest.raises(UnknownTenantError):
+        registry.get(tenant_id)
+
+
+def test_default_tenant_reads_shared_data_dir(tenants_dir):
+    registry = TenantKnowledgeBaseRegistry(tenants_dir=str(tenants_dir))
+    assert "customer_101" in registry.get(DEFAULT_TENANT).billing
+
+
+def test_active_tenant_selects_knowledge_base(tenants_dir):
+    registry = TenantKnowledgeBaseRegistry(tenants_dir=str(tenants_dir))
+    with use_tenant("globex"):
+        assert get_active_tenant() == "globex"
+        assert get_active_knowledge_base(registry).tech["app crashing"] == "Globex fix"
+    assert get_active_tenant() == DEFAULT_TENANT
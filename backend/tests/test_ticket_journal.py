@@ -0,0 +1,196 @@
+# backend/tests/test_ticket_journal.py
+import json
+
+import pytest
+
+from tools.ticket_journal import TICKET_ID_PATTERN, TicketJournal, use_ticket_session
+
+ROUTER_ISSUE = "Customer router keeps dropping the wifi connection every hour"
+BILLING_ISSUE = "Customer was charged twice for the monthly premium plan"
+
+
+@pytest.fixture
+def journal_path(tmp_path):
+    return str(tmp_path / "tickets.jsonl")
+
+
+def test_replay_restores_tickets_and_statuses(journal_path):
+    journal = TicketJournal(journal_path)
+    ticket, _ = journal.create_ticket(ROUTER_ISSUE, "ann@example.com", "session-1")
+    journal.update_status(ticket["ticket_id"], "pending")
+    journal.close()
+
+    replayed = TicketJournal(journal_path)
+    restored = replayed.get(ticket["ticket_id"])
+    assert restored["status"] == "pending"
+    assert restored["summary"] == ROUTER_ISSUE
+    assert replayed.find_by_email("ANN@example.com")[0]["ticket_id"] == ticket["ticket_id"]
+    assert replayed.find_by_session("session-1")[0]["ticket_id"] == ticket["ticket_id"]
+
+
+def test_torn_record_is_skipped_and_next_write_starts_a_new_line(journal_path):
+    journal = TicketJournal(journal_path)
+    ticket, _ = journal.create_ticket(ROUTER_ISSUE, "ann@example.com", "session-1")
+    journal.close()
+    with open(journal_path, "a") as f:
+        f.write('{"event": "created", "ticket_id": "AB')  # Crash mid-write
+
+    recovered = TicketJournal(journal_path)
+    assert recovered.stats()["tickets"] == 1
+    second, _ = recovered.create_ticket(BILLING_ISSUE, "bob@example.com", "session-2")
+    recovered.close()
+
+    replayed = TicketJournal(journal_path)
+    assert replayed.get(ticket["ticket_id"]) is not None
+    assert replayed.get(second["ticket_id"]) is not None
+
+
+def test_duplicate_within_window_reuses_open_ticket(journal_path):
+    journal = TicketJournal(journal_path)
+    first, first_duplicate = journal.create_ticket(ROUTER_ISSUE, "ann@example.com", "session-1")
+    again, is_duplicate = journal.create_ticket(
+        "Router keeps dropping the wifi connection", "ann@example.com", "session-1"
+    )
+    assert not first_duplicate
+    assert is_duplicate and again["ticket_id"] == first["ticket_id"]
+    assert journal.stats()["duplicates_suppressed"] == 1
+
+    journal.update_status(first["ticket_id"], "resolved")
+    reopened, is_duplicate = journal.create_ticket(ROUTER_ISSUE, "ann@example.com", "session-1")
+    assert not is_duplicate and reopened["ticket_id"] != first["ticket_id"]
+
+
+def test_duplicate_via_session_email_is_linked_to_the_session(journal_path):
+    journal = TicketJournal(journal_path)
+    first, _ = journal.create_ticket(ROUTER_ISSUE, "ann@example.com", "session-1")
+    # A later session that already gave the same email on one of its own tickets
+    journal.create_ticket(BILLING_ISSUE, "ann@example.com", "session-2")
+    again, is_duplicate = journal.create_ticket(ROUTER_ISSUE, "ann@example.com", "session-2")
+    assert is_duplicate and again["ticket_id"] == first["ticket_id"]
+    assert journal.get_for_session(first["ticket_id"], "session-2") is not None
+    journal.close()
+
+    replayed = TicketJournal(journal_path)
+    assert first["ticket_id"] in [t["ticket_id"] for t in replayed.find_for_session("session-2")]
+    assert replayed.get(first["ticket_id"])["session_id"] == "session-1"
+
+
+def test_typed_email_does_not_match_another_sessions_ticket(journal_path):
+    journal = TicketJournal(journal_path)
+    victim, _ = journal.create_ticket(ROUTER_ISSUE, "victim@example.com", "victim-session")
+    ticket, is_duplicate = journal.create_ticket(
+        ROUTER_ISSUE, "victim@example.com", "attacker-session"
+    )
+    assert not is_duplicate and ticket["ticket_id"] != victim["ticket_id"]
+    assert journal.get_for_session(victim["ticket_id"], "attacker-session") is None
+    assert [t["ticket_id"] for t in journal.find_for_session("attacker-session")] == [
+        ticket["ticket_id"]
+    ]
+
+
+def test_escalation_reply_does_not_reveal_another_sessions_ticket(journal_path, monkeypatch):
+    knowledge_base_tools = pytest.importorskip("tools.knowledge_base_tools")
+    journal = TicketJournal(journal_path)
+    monkeypatch.setattr(knowledge_base_tools, "ticket_journal", journal)
+    monkeypatch.setattr(knowledge_base_tools, "send_email", lambda *args: None)
+    summary = "Customer requested direct escalation. Context: connect me to human"
+    victim, _ = journal.create_ticket(summary, "victim@example.com", "victim-session")
+    journal.update_status(victim["ticket_id"], "pending")
+
+    with use_ticket_session("attacker-session"):
+        reply = knowledge_base_tools._raw_escalate_to_human_logic(
+            summary, user_email="victim@example.com"
+        )
+    assert victim["ticket_id"] not in reply
+    assert "already" not in reply and "PENDING" not in reply.upper()
+
+
+def test_duplicate_window_expires(journal_path):
+    journal = TicketJournal(journal_path, duplicate_window=0)
+    first, _ = journal.create_ticket(ROUTER_ISSUE, "ann@example.com", "session-1")
+    second, is_duplicate = journal.create_ticket(ROUTER_ISSUE, "ann@example.com", "session-1")
+    assert not is_duplicate and second["ticket_id"] != first["ticket_id"]
+
+
+def test_same_session_with_different_issue_is_not_a_duplicate(journal_path):
+    journal = TicketJournal(journal_path)
+    first, _ = journal.create_ticket(ROUTER_ISSUE, "ann@example.com", "session-1")
+    second, is_duplicate = journal.create_ticket(BILLING_ISSUE, "ann@example.com", "session-1")
+    assert not is_duplicate and second["ticket_id"] != first["ticket_id"]
+
+
+def test_escalations_without_email_are_not_matched_by_email(journal_path):
+    journal = TicketJournal(journal_path)
+    first, _ = journal.create_ticket(ROUTER_ISSUE, None, "session-1")
+    second, is_duplicate = journal.create_ticket(ROUTER_ISSUE, None, "session-2")
+    assert not is_duplicate and second["ticket_id"] != first["ticket_id"]
+    assert second["email"] is None
+
+
+def test_lookups_and_duplicates_are_scoped_to_tenant(journal_path):
+    journal = TicketJournal(journal_path)
+    acme, _ = journal.create_ticket(ROUTER_ISSUE, "ann@example.com", "session-1", "acme")
+    globex, is_duplicate = journal.create_ticket(
+        ROUTER_ISSUE, "ann@example.com", "session-1", "globex"
+    )
+    assert not is_duplicate
+    assert journal.get(acme["ticket_id"], "globex") is None
+    assert [t["ticket_id"] for t in journal.find_by_email("ann@example.com", "acme")] == [
+        acme["ticket_id"]
+    ]
+    assert [t["ticket_id"] for t in journal.find_for_session("session-1", "globex")] == [
+        globex["ticket_id"]
+    ]
+    with pytest.raises(KeyError):
+        journal.update_status(acme["ticket_id"], "closed", "globex")
+
+
+def test_session_sees_only_its_own_tickets(journal_path):
+    journal = TicketJournal(journal_path)
+    earlier, _ = journal.create_ticket(BILLING_ISSUE, "ann@example.com", "session-old")
+    first, _ = journal.create_ticket(ROUTER_ISSUE, "ann@example.com", "session-new")
+    second, _ = journal.create_ticket(
+        "Customer cannot log in to the mobile app", "ann@example.com", "session-new"
+    )
+
+    visible = [t["ticket_id"] for t in journal.find_for_session("session-new")]
+    assert visible == [first["ticket_id"], second["ticket_id"]]
+    # The same email on another session's ticket is not proof of ownership
+    assert journal.get_for_session(earlier["ticket_id"], "session-new") is None
+    assert journal.find_for_session("session-unknown") == []
+
+
+def test_update_status_validates_status_and_ticket(journal_path):
+    journal = TicketJournal(journal_path)
+    ticket, _ = journal.create_ticket(ROUTER_ISSUE, "ann@example.com", "session-1")
+    with pytest.raises(ValueError):
+        journal.update_status(ticket["ticket_id"], "escalated")
+    with pytest.raises(KeyError):
+        journal.update_status("FFFFFFFF", "closed")
+    updated = journal.update_status(ticket["ticket_id"], "closed")
+    assert updated["status"] == "closed" and updated["updated_at"] >= ticket["created_at"]
+
+    journal.close()
+    with open(journal_path) as f:
+        events = [json.loads(line)["event"] for line in f]
+    assert events == ["created", "status"]
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("status of ticket 1A2B3C4D?", ["1A2B3C4D"]),
+        ("my order from 20251019", []),
+        ("ticket 1a2b3c4d", []),
+        ("order 12345678", []),
+    ],
+)
+def test_ticket_id_pattern(text, expected):
+    assert TICKET_ID_PATTERN.findall(text) == expected
+
+
+def test_new_ticket_ids_match_the_pattern(journal_path):
+    journal = TicketJournal(journal_path)
+    for i in range(50):
+        ticket, _ = journal.create_ticket(f"Issue {i}", None)
+        assert TICKET_ID_PATTERN.fullmatch(ticket["ticket_id"])
@@ -0,0 +1,103 @@
+# backend/tests/test_tool_cache.py
+import pytest
+
+from tools import tool_cache
+from tools.tool_cache import (
+    ToolResultCache,
+    get_active_tool_cache,
+    memoized_tool_call,
+    use_tool_cache,
+)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(tool_cache.time, "time", clock)
+    return clock
+
+
+def _counting(result="answer"):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return result
+
+    return compute, calls
+
+
+def test_rephrased_call_hits_cache():
+    cache = ToolResultCache()
+    compute, calls = _counting()
+    cache.call("get_tech_solution", "My internet is not working", compute)
+    assert cache.call("get_tech_solution", "internet not working!", compute) == "answer"
+    assert len(calls) == 1
+    assert cache.stats()["tool_calls"] == 1
+    assert cache.stats()["saved_tool_calls"] == 1
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = ToolResultCache(ttls={"get_billing_info": 120})
+    compute, calls = _counting()
+    cache.call("get_billing_info", "customer_101", compute)
+    clock.now += 119
+    cache.call("get_billing_info", "customer_101", compute)
+    clock.now += 2
+    cache.call("get_billing_info", "customer_101", compute)
+    assert len(calls) == 2
+
+
+def test_payment_event_invalidates_billing_only():
+    cache = ToolResultCache()
+    cache.put("get_billing_info", "customer_101", "balance $50")
+    cache.put("get_tech_solution", "app crashing", "update the app")
+    assert cache.notify("payment") == 1
+    assert cache.get("get_billing_info", "customer_101") is None
+    assert cache.get("get_tech_solution", "app crashing") == "update the app"
+
+
+def test_context_only_offers_matching_key():
+    cache = ToolResultCache()
+    cache.put("get_tech_solution", "printer not printing", "reinstall the driver")
+    assert cache.context_for("get_tech_solution", "app keeps crashing") == ""
+    assert (
+        cache.context_for("get_tech_solution", "my printer is not printing")
+        == "reinstall the driver"
+    )
+
+
+def test_estimated_saved_iterations():
+    cache = ToolResultCache()
+    cache.begin_turn()
+    cache.end_turn(offered_context=True, response="Restart your router.")
+    cache.begin_turn()
+    cache.end_turn(offered_context=True, response="NEED_EMAIL_FOR_ESCALATION: outage")
+    cache.begin_turn()
+    cache.end_turn(offered_context=False, response="Which device are you using?")
+    cache.begin_turn()
+    cache.call("get_tech_solution", "router", lambda: "x")
+    cache.end_turn(offered_context=True, response="Restart your router.")
+    stats = cache.stats()
+    assert stats["estimated_saved_iterations"] == 1
+    assert stats["agent_turns"] == 4
+
+
+def test_memoized_call_uses_active_cache_only_inside_block():
+    compute, calls = _counting()
+    cache = ToolResultCache()
+    with use_tool_cache(cache):
+        assert get_active_tool_cache() is cache
+        memoized_tool_call("get_faq_answer", "what are your hours", compute)
+        memoized_tool_call("get_faq_answer", "what are your hours", compute)
+    assert get_active_tool_cache() is None
+    memoized_tool_call("get_faq_answer", "what are your hours", compute)
+    assert len(calls) == 2
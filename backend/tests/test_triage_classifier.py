@@ -0,0 +1,147 @@
+# backend/tests/test_triage_classifier.py
+import json
+
+import numpy as np
+import pytest
+
+from agents.triage_classifier import (
+    TriageClassifier,
+    artifact_path,
+    dedupe_routing_records,
+    hash_features,
+    load_latest_triage_classifier,
+    load_routing_examples,
+    load_routing_records,
+    log_routing_decision,
+    redact_query,
+    split_routing_records,
+    train_triage_classifier,
+)
+from tools.tenant_kb import use_tenant
+
+EXAMPLES = [
+    ("my internet is down", "TECH"),
+    ("the app keeps crashing", "TECH"),
+    ("wifi not working on my laptop", "TECH"),
+    ("what is my balance", "BILLING"),
+    ("I was charged twice this month", "BILLING"),
+    ("change my payment plan", "BILLING"),
+    ("what are your opening hours", "FAQ"),
+    ("where is your office located", "FAQ"),
+    ("do you offer refunds", "FAQ"),
+] * 5
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    return train_triage_classifier(EXAMPLES, n_features=2**10, epochs=30)
+
+
+def test_learns_training_routes(classifier):
+    assert classifier.predict("my internet is down")[0] == "TECH"
+    assert classifier.predict("what is my balance")[0] == "BILLING"
+    assert classifier.predict("what are your opening hours")[0] == "FAQ"
+
+
+def test_save_load_round_trip(classifier, tmp_path):
+    classifier.version = 3
+    classifier.metadata = {"training_examples": len(EXAMPLES)}
+    classifier.save(artifact_path(3, str(tmp_path)))
+    TriageClassifier(np.zeros((3, 8)), np.zeros(3), version=1).save(
+        artifact_path(1, str(tmp_path))
+    )
+
+    loaded = load_latest_triage_classifier(str(tmp_path))
+    assert loaded.version == 3
+    assert loaded.metadata["training_examples"] == len(EXAMPLES)
+    for query, _ in EXAMPLES[:9]:
+        np.testing.assert_allclose(
+            loaded.predict_proba(query), classifier.predict_proba(query), rtol=1e-6
+        )
+
+
+def test_no_artifact_loads_none(tmp_path):
+    assert load_latest_triage_classifier(str(tmp_path)) is None
+
+
+def test_only_confident_predictions_bypass_the_llm(classifier):
+    route, probability = classifier.predict("my internet is down")
+    assert classifier.predict_if_confident("my internet is down", probability) == (
+        route,
+        probability,
+    )
+    assert classifier.predict_if_confident("my internet is down", probability + 1e-6) is None
+    # An untrained model is uniform over the routes, so it never bypasses
+    untrained = TriageClassifier(np.zeros((3, 8)), np.zeros(3))
+    assert untrained.predict_if_confident("my internet is down", 0.5) is None
+
+
+def test_log_redacts_personal_data_and_records_tenant(tmp_path):
+    path = str(tmp_path / "routing_log.jsonl")
+    with use_tenant("acme"):
+        log_routing_decision(
+            "Bill for Customer_123, email me at ann.lee+x@example.co.uk",
+            "BILLING",
+            "llm",
+            0.8,
+            llm_route="FAQ",
+            path=path,
+        )
+    with open(path) as f:
+        record = json.loads(f.readline())
+    assert record["query"] == "Bill for customer_<id>, email me at <email>"
+    assert record["tenant_id"] == "acme"
+    assert record["route"] == "BILLING" and record["llm_route"] == "FAQ"
+    assert record["latency_ms"] == 800.0
+
+
+def test_serving_features_match_redacted_training_data(tmp_path):
+    path = str(tmp_path / "routing_log.jsonl")
+    for i, (query, route) in enumerate(EXAMPLES):
+        if route == "BILLING":
+            query = f"{query} for customer_{100 + i}, mail bob{i}@x.com"
+        log_routing_decision(query, route, "llm", path=path)
+    model = train_triage_classifier(load_routing_examples([path]), n_features=2**10)
+
+    live, logged = "balance for customer_101", "balance for customer_<id>"
+    np.testing.assert_array_equal(
+        hash_features(live, 2**10)[0], hash_features(logged, 2**10)[0]
+    )
+    assert model.predict(live) == model.predict(logged)
+    assert model.predict("write to bob@x.com") == model.predict("write to <email>")
+
+
+def test_redact_query_leaves_other_text_alone():
+    assert redact_query("my customer 42 account") == "my customer_<id> account"
+    assert redact_query("router model 1234 is down") == "router model 1234 is down"
+
+
+def test_dedupe_keeps_latest_record_per_normalized_query(tmp_path):
+    path = tmp_path / "routing_log.jsonl"
+    lines = [
+        {"query": "My internet is DOWN!", "route": "FAQ", "timestamp": 1},
+        {"query": "my internet is down", "route": "TECH", "llm_route": "TECH", "timestamp": 2},
+        {"query": "what is my balance", "route": "BILLING", "timestamp": 3},
+        {"query": "classifier decision", "route": "TECH", "source": "classifier"},
+    ]
+    path.write_text("\n".join(json.dumps(line) for line in lines) + "\n")
+
+    records = dedupe_routing_records(load_routing_records([str(path)]))
+    assert [(r["query"], r["route"], r["llm_route"]) for r in records] == [
+        ("my internet is down", "TECH", "TECH"),
+        ("what is my balance", "BILLING", None),
+    ]
+
+
+def test_time_split_holds_out_newest_records():
+    records = [
+        {"query": f"query {i}", "route": "FAQ", "llm_route": None, "timestamp": t}
+        for i, t in enumerate([5, 1, None, 4, 3])
+    ]
+    train, test = split_routing_records(records, holdout=0.4, by_time=True)
+    assert [r["timestamp"] for r in train] == [None, 1, 3]
+    assert [r["timestamp"] for r in test] == [4, 5]
+
+    train, test = split_routing_records(records, holdout=0.4, seed=1)
+    assert len(test) == 2
+    assert sorted(r["query"] for r in train + test) == sorted(r["query"] for r in records)
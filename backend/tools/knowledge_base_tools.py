@@ -1,40 +1,23 @@
 # backend/tools/knowledge_base_tools.py
-import json
 import os
-import uuid
 from typing import Optional
 from dotenv import load_dotenv
 import smtplib
 from email.mime.text import MIMEText
 from pydantic import BaseModel, Field
+from tools.tenant_kb import get_active_knowledge_base, get_active_tenant
+from tools.ticket_journal import get_active_session_id, ticket_journal
+from tools.tool_cache import memoized_tool_call
 from langchain_core.tools import (
     tool as langchain_tool,
     tool,  # Import the tool decorator
 )
 
 
-# --- Knowledge Base Data Loading ---
-def load_json_data(filepath):
-    try:
-        with open(filepath, "r") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        print(f"Warning: Data file not found at {filepath}. Returning empty data.")
-        return {}
-    except json.JSONDecodeError:
-        print(f"Warning: Could not decode JSON from {filepath}. Returning empty data.")
-        return {}
-
-
-FAQ_KB = load_json_data(
-    os.path.join(os.path.dirname(__file__), "../data/faq_knowledge_base.json")
-)
-TECH_KB = load_json_data(
-    os.path.join(os.path.dirname(__file__), "../data/tech_kb.json")
-)
-BILLING_DB = load_json_data(
-    os.path.join(os.path.dirname(__file__), "../data/billing_db.json")
-)
+# Knowledge base data is tenant-scoped and loaded lazily by tools.tenant_kb;
+# each lookup below reads from the knowledge base of the request's tenant.
+
+FAQ_NOT_FOUND_ANSWER = "I could not find an answer to your question in the FAQ. Please try rephrasing or ask for human assistance."
 
 # --- Tool Definitions (Raw Python Functions) ---
 
@@ -45,19 +28,24 @@ def get_faq_answer(query: str) -> str:
     Looks up an answer to a common customer question in the FAQ knowledge base.
     Use this for general inquiries like 'What are your hours?' or 'How do I reset my password?'.
     """
-    query_words = set(query.lower().split())
+    return memoized_tool_call("get_faq_answer", query, lambda: _lookup_faq_answer(query))
+
+
+def _lookup_faq_answer(query: str) -> str:
+    faq_index = get_active_knowledge_base().faq_index
+    query_lower = query.lower()
+    query_words = set(query_lower.split())
 
     # First try exact phrase matching
-    for faq_q, faq_a in FAQ_KB.items():
-        if faq_q.lower() in query.lower():
+    for faq_q, _, faq_a in faq_index:
+        if faq_q in query_lower:
             return faq_a
 
     # Then try keyword matching
     best_match = None
     max_word_match = 0
 
-    for faq_q, faq_a in FAQ_KB.items():
-        faq_words = set(faq_q.lower().split())
+    for _, faq_words, faq_a in faq_index:
         matching_words = query_words.intersection(faq_words)
 
         # Check if this is a better match than what we've seen
@@ -73,7 +61,7 @@ def get_faq_answer(query: str) -> str:
     if best_match and max_word_match >= 2:
         return best_match
 
-    return "I could not find an answer to your question in the FAQ. Please try rephrasing or ask for human assistance."
+    return FAQ_NOT_FOUND_ANSWER
 
 
 @tool
@@ -81,20 +69,27 @@ def get_tech_solution(issue: str) -> str:
     """
     Returns a solution from the tech knowledge base using keyword matching.
     """
+    return memoized_tool_call(
+        "get_tech_solution", issue, lambda: _lookup_tech_solution(issue)
+    )
+
+
+def _lookup_tech_solution(issue: str) -> str:
+    tech_kb = get_active_knowledge_base().tech
     issue_lower = issue.lower()
     # Exact match first
-    if issue_lower in TECH_KB:
-        return TECH_KB[issue_lower]
+    if issue_lower in tech_kb:
+        return tech_kb[issue_lower]
 
     # Fuzzy/keyword match
-    for kb_key in TECH_KB:
+    for kb_key in tech_kb:
         if kb_key in issue_lower or issue_lower in kb_key:
-            return TECH_KB[kb_key]
+            return tech_kb[kb_key]
 
     # Partial word match
-    for kb_key in TECH_KB:
+    for kb_key in tech_kb:
         if any(word in kb_key for word in issue_lower.split()):
-            return TECH_KB[kb_key]
+            return tech_kb[kb_key]
 
     return "Sorry, I couldn't find a solution for your issue. Please provide more details or contact support."
 
@@ -105,7 +100,13 @@ def get_billing_info(customer_id: str) -> str:
     Retrieves billing information for a specific customer ID from the billing database.
     Use this for queries like 'What's my bill for customer_101?' or 'Check payment status for customer_555'.
     """
-    info = BILLING_DB.get(customer_id)
+    return memoized_tool_call(
+        "get_billing_info", customer_id, lambda: _lookup_billing_info(customer_id)
+    )
+
+
+def _lookup_billing_info(customer_id: str) -> str:
+    info = get_active_knowledge_base().billing.get(customer_id)
     if info:
         return (
             f"Customer ID: {customer_id}, Name: {info['name']}, "
@@ -129,9 +130,26 @@ class EscalateToHumanArgs(BaseModel):
 
 # --- Raw Function for Escalation Logic (for direct calls in main.py) ---
 # This is the actual Python function that contains the escalation logic.
-def _raw_escalate_to_human_logic(summary: str, user_email: Optional[str] = None) -> str:
-    ticket_id = str(uuid.uuid4()).replace("-", "")[:8].upper()
+def _raw_escalate_to_human_logic(
+    summary: str, user_email: Optional[str] = None, session_id: Optional[str] = None
+) -> str:
     final_email = user_email if user_email else "customer@example.com"
+    # The placeholder address is not the customer's, so it is never journaled
+    ticket, is_duplicate = ticket_journal.create_ticket(
+        summary,
+        user_email or None,
+        session_id or get_active_session_id(),
+        get_active_tenant(),
+    )
+    ticket_id = ticket["ticket_id"]
+
+    if is_duplicate:
+        # Same issue re-escalated: point to the open ticket instead of emailing a new one
+        print(f"Duplicate escalation suppressed; existing ticket {ticket_id}")
+        return (
+            f"This issue is already with our human support team under ticket {ticket_id} "
+            f"(status: {ticket['status']}). A representative will contact you at {final_email}."
+        )
 
     subject = f"Support Ticket #{ticket_id} Created"
     body = f"""Dear Customer,\n\nYour support request has been received and escalated to our support team.\n\nTicket Details:\n- Ticket ID: {ticket_id}\n- Status: Open\n- Summary: {summary}\n\nA support representative will contact you shortly to assist you with your issue.\n\nPlease keep this ticket number for your reference: {ticket_id}\n\nIf you need to follow up on this ticket, please reply to this email or contact our support team with your ticket number.\n\nBest regards,\nCustomer Support Team,\nVishnu."""
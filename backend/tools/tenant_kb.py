@@ -0,0 +1,205 @@
+# backend/tools/tenant_kb.py
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# --- Tenant Configuration ---
+DEFAULT_TENANT = "default"
+DATA_DIR = os.path.join(os.path.dirname(__file__), "../data")
+# Each non-default tenant keeps its own copy of the data files in TENANTS_DIR/<tenant_id>/
+TENANTS_DIR = os.getenv("TENANT_DATA_DIR", os.path.join(DATA_DIR, "tenants"))
+# Approximate memory budget for resident tenant knowledge bases
+TENANT_KB_MAX_BYTES = int(os.getenv("TENANT_KB_MAX_BYTES", str(64 * 1024 * 1024)))
+
+FAQ_FILE = "faq_knowledge_base.json"
+TECH_FILE = "tech_kb.json"
+BILLING_FILE = "billing_db.json"
+
+_TENANT_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class UnknownTenantError(ValueError):
+    """Raised when a request names a tenant with no knowledge base on disk."""
+
+
+# --- Knowledge Base Data Loading ---
+def load_json_data(filepath):
+    try:
+        with open(filepath, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        print(f"Warning: Data file not found at {filepath}. Returning empty data.")
+        return {}
+    except json.JSONDecodeError:
+        print(f"Warning: Could not decode JSON from {filepath}. Returning empty data.")
+        return {}
+
+
+def _estimate_size(obj: Any) -> int:
+    """Rough recursive in-memory size of loaded JSON data, in bytes."""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_estimate_size(k) + _estimate_size(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_estimate_size(item) for item in obj)
+    return size
+
+
+class TenantKnowledgeBase:
+    """One tenant's FAQ, tech KB and billing data plus the lookup indexes built from them."""
+
+    def __init__(
+        self,
+        tenant_id: str,
+        faq: Dict[str, str],
+        tech: Dict[str, str],
+        billing: Dict[str, Dict[str, str]],
+    ):
+        self.tenant_id = tenant_id
+        self.faq = faq
+        self.tech = tech
+        self.billing = billing
+        # FAQ entries with their lowercased question and word set precomputed
+        self.faq_index: List[Tuple[str, Set[str], str]] = [
+            (question.lower(), set(question.lower().split()), answer)
+            for question, answer in faq.items()
+        ]
+        self.size_bytes = (
+            _estimate_size(faq)
+            + _estimate_size(tech)
+            + _estimate_size(billing)
+            + _estimate_size(self.faq_index)
+        )
+
+    @classmethod
+    def load(cls, tenant_id: str, data_dir: str) -> "TenantKnowledgeBase":
+        return cls(
+            tenant_id,
+            faq=load_json_data(os.path.join(data_dir, FAQ_FILE)),
+            tech=load_json_data(os.path.join(data_dir, TECH_FILE)),
+            billing=load_json_data(os.path.join(data_dir, BILLING_FILE)),
+        )
+
+
+class TenantKnowledgeBaseRegistry:
+    """Loads tenant knowledge bases lazily and keeps them in a memory-bounded LRU."""
+
+    def __init__(
+        self,
+        max_bytes: int = TENANT_KB_MAX_BYTES,
+        tenants_dir: str = TENANTS_DIR,
+        default_data_dir: str = DATA_DIR,
+    ):
+        self.max_bytes = max_bytes
+        self.tenants_dir = tenants_dir
+        self.default_data_dir = default_data_dir
+        self._resident: "OrderedDict[str, TenantKnowledgeBase]" = OrderedDict()
+        self._resident_bytes = 0
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def data_dir_for(self, tenant_id: str) -> str:
+        if tenant_id == DEFAULT_TENANT:
+            return self.default_data_dir
+        if not _TENANT_ID_PATTERN.match(tenant_id):
+            raise UnknownTenantError(f"Invalid tenant ID: {tenant_id!r}")
+        data_dir = os.path.join(self.tenants_dir, tenant_id)
+        if not os.path.isdir(data_dir):
+            raise UnknownTenantError(f"Unknown tenant: {tenant_id!r}")
+        return data_dir
+
+    def get(self, tenant_id: str) -> TenantKnowledgeBase:
+        """Return the tenant's knowledge base, loading it on first use."""
+        with self._lock:
+            kb = self._resident.get(tenant_id)
+            if kb is not None:
+                self._resident.move_to_end(tenant_id)
+                return kb
+
+            data_dir = self.data_dir_for(tenant_id)
+            start = time.perf_counter()
+            kb = TenantKnowledgeBase.load(tenant_id, data_dir)
+            load_seconds = time.perf_counter() - start
+
+            stats = self._tenant_stats(tenant_id)
+            stats["loads"] += 1
+            stats["last_load_seconds"] = load_seconds
+            stats["total_load_seconds"] += load_seconds
+            print(
+                f"Loaded knowledge base for tenant '{tenant_id}' in "
+                f"{load_seconds * 1000:.1f} ms (~{kb.size_bytes} bytes)"
+            )
+
+            self._resident[tenant_id] = kb
+            self._resident_bytes += kb.size_bytes
+            self._evict_over_budget()
+            return kb
+
+    def _evict_over_budget(self) -> None:
+        # Always keep the most recently used tenant, even if it alone exceeds the budget
+        while self._resident_bytes > self.max_bytes and len(self._resident) > 1:
+            tenant_id, kb = self._resident.popitem(last=False)
+            self._resident_bytes -= kb.size_bytes
+            self._tenant_stats(tenant_id)["evictions"] += 1
+            print(f"Evicted knowledge base for tenant '{tenant_id}' from memory")
+
+    def _tenant_stats(self, tenant_id: str) -> Dict[str, float]:
+        return self._stats.setdefault(
+            tenant_id,
+            {
+                "loads": 0,
+                "evictions": 0,
+                "last_load_seconds": 0.0,
+                "total_load_seconds": 0.0,
+            },
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "resident_tenants": list(self._resident),
+                "resident_bytes": self._resident_bytes,
+                "max_bytes": self.max_bytes,
+                "tenants": {
+                    tenant_id: {
+                        **stats,
+                        "resident": tenant_id in self._resident,
+                    }
+                    for tenant_id, stats in self._stats.items()
+                },
+            }
+
+
+tenant_knowledge_bases = TenantKnowledgeBaseRegistry()
+
+# --- Active Tenant for the Current Request ---
+# Tools are bound to agents at construction time, so the request's tenant is
+# threaded to them through a context variable set by the orchestrator.
+_active_tenant: ContextVar[str] = ContextVar("active_tenant", default=DEFAULT_TENANT)
+
+
+def get_active_tenant() -> str:
+    return _active_tenant.get()
+
+
+@contextmanager
+def use_tenant(tenant_id: str):
+    """Make `tenant_id` the tenant whose knowledge base tools use inside this block."""
+    token = _active_tenant.set(tenant_id)
+    try:
+        yield tenant_id
+    finally:
+        _active_tenant.reset(token)
+
+
+def get_active_knowledge_base(
+    registry: Optional[TenantKnowledgeBaseRegistry] = None,
+) -> TenantKnowledgeBase:
+    return (registry or tenant_knowledge_bases).get(_active_tenant.get())
@@ -0,0 +1,346 @@
+# backend/tools/ticket_journal.py
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from tools.tenant_kb import DEFAULT_TENANT
+
+# --- Journal Configuration ---
+TICKET_JOURNAL_PATH = os.getenv(
+    "TICKET_JOURNAL_PATH",
+    os.path.join(os.path.dirname(__file__), "../data/tickets.jsonl"),
+)
+# Records are flushed to the OS on every write but only fsynced once this many
+# have accumulated or this many seconds have passed, whichever comes first.
+TICKET_FSYNC_BATCH = int(os.getenv("TICKET_FSYNC_BATCH", "32"))
+TICKET_FSYNC_INTERVAL = float(os.getenv("TICKET_FSYNC_INTERVAL", "1.0"))
+# Re-escalations of the same issue within this window reuse the open ticket
+DUPLICATE_ESCALATION_WINDOW = float(os.getenv("DUPLICATE_ESCALATION_WINDOW", "1800"))
+# Minimum word overlap for two summaries to count as the same issue
+DUPLICATE_SUMMARY_SIMILARITY = 0.5
+
+TICKET_STATUSES = ("open", "pending", "resolved", "closed")
+# Ticket IDs are 8 uppercase hex characters with at least one letter, so order
+# numbers and dates ("20251019") are never read as ticket IDs.
+TICKET_ID_PATTERN = re.compile(r"\b(?=[0-9A-F]*[A-F])[0-9A-F]{8}\b")
+
+
+def _summary_words(summary: str) -> Set[str]:
+    return {word for word in re.findall(r"[a-z0-9_]+", summary.lower()) if len(word) > 2}
+
+
+class TicketJournal:
+    """Append-only JSON-lines journal of support tickets with in-memory indexes
+    by ticket ID, email and session. Emails and sessions are indexed per tenant,
+    and every lookup is scoped to one tenant. A session's index holds the tickets
+    it created and those it was linked to as a duplicate escalation."""
+
+    def __init__(
+        self,
+        path: str = TICKET_JOURNAL_PATH,
+        fsync_batch: int = TICKET_FSYNC_BATCH,
+        fsync_interval: float = TICKET_FSYNC_INTERVAL,
+        duplicate_window: float = DUPLICATE_ESCALATION_WINDOW,
+    ):
+        self.path = path
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+        self.duplicate_window = duplicate_window
+        self._tickets: Dict[str, Dict[str, Any]] = {}
+        self._by_email: Dict[Tuple[str, str], List[str]] = {}
+        self._by_session: Dict[Tuple[str, str], List[str]] = {}
+        self._lock = threading.Lock()
+        self._file = None
+        self._unsynced = 0
+        self._last_fsync = time.time()
+        self.records_written = 0
+        self.duplicates_suppressed = 0
+        self._replay()
+
+    # --- Loading ---
+    def _replay(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r") as f:
+            for line_number, line in enumerate(f, 1):
+                try:
+                    self._apply(json.loads(line))
+                except (json.JSONDecodeError, KeyError):
+                    # A torn final write after a crash; everything before it is intact
+                    print(
+                        f"Warning: Skipping unreadable ticket journal record "
+                        f"at {self.path}:{line_number}"
+                    )
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        ticket_id = record["ticket_id"]
+        if record["event"] == "created":
+            ticket = {
+                key: record[key]
+                for key in ("ticket_id", "email", "session_id", "summary", "created_at")
+            }
+            ticket["tenant_id"] = record.get("tenant_id", DEFAULT_TENANT)
+            ticket["status"] = "open"
+            ticket["updated_at"] = record["created_at"]
+            self._tickets[ticket_id] = ticket
+            tenant_id = ticket["tenant_id"]
+            if ticket["email"]:
+                self._by_email.setdefault(
+                    (tenant_id, ticket["email"].lower()), []
+                ).append(ticket_id)
+            if ticket["session_id"]:
+                self._by_session.setdefault(
+                    (tenant_id, ticket["session_id"]), []
+                ).append(ticket_id)
+        elif record["event"] == "linked" and ticket_id in self._tickets:
+            session_tickets = self._by_session.setdefault(
+                (self._tickets[ticket_id]["tenant_id"], record["session_id"]), []
+            )
+            if ticket_id not in session_tickets:
+                session_tickets.append(ticket_id)
+        elif record["event"] == "status" and ticket_id in self._tickets:
+            self._tickets[ticket_id]["status"] = record["status"]
+            self._tickets[ticket_id]["updated_at"] = record["updated_at"]
+
+    # --- Writing ---
+    def _append(self, record: Dict[str, Any]) -> None:
+        if self._file is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._file = open(self.path, "a")
+            if self._ends_with_torn_record():
+                # Terminate a partial record so the next one starts on its own line
+                self._file.write("\n")
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        self._apply(record)
+        self.records_written += 1
+        self._unsynced += 1
+        if (
+            self._unsynced >= self.fsync_batch
+            or time.time() - self._last_fsync >= self.fsync_interval
+        ):
+            self._fsync()
+
+    def _ends_with_torn_record(self) -> bool:
+        if os.path.getsize(self.path) == 0:
+            return False
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+
+    def _fsync(self) -> None:
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_fsync = time.time()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._fsync()
+
+    async def run_periodic_flush(self) -> None:
+        """Fsync records left pending by a quiet period; intended to run as a background task."""
+        while True:
+            await asyncio.sleep(self.fsync_interval)
+            if self._unsynced:
+                # fsync blocks; keep it off the event loop
+                await asyncio.get_running_loop().run_in_executor(None, self.flush)
+
+    def close(self) -> None:
+        with self._lock:
+            self._fsync()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _new_ticket_id(self) -> str:
+        while True:
+            ticket_id = str(uuid.uuid4()).replace("-", "")[:8].upper()
+            if TICKET_ID_PATTERN.fullmatch(ticket_id) and ticket_id not in self._tickets:
+                return ticket_id
+
+    def _find_duplicate(
+        self,
+        summary: str,
+        email: Optional[str],
+        session_id: Optional[str],
+        tenant_id: str,
+        now: float,
+    ) -> Optional[Dict[str, Any]]:
+        """Find an open ticket for the same issue escalated within the window, with a
+        similar summary, among the session's tickets. Emails typed into the chat are
+        never verified, so other sessions' tickets for `email` are only considered
+        if the session already gave that email on a ticket it created."""
+        if not session_id:
+            return None
+        session_tickets = self._by_session.get((tenant_id, session_id), [])
+        candidates = list(session_tickets)
+        session_emails = {
+            self._tickets[tid]["email"].lower()
+            for tid in session_tickets
+            if self._tickets[tid]["session_id"] == session_id and self._tickets[tid]["email"]
+        }
+        if email and email.lower() in session_emails:
+            candidates += self._by_email.get((tenant_id, email.lower()), [])
+        words = _summary_words(summary)
+        for ticket_id in sorted(
+            set(candidates), key=lambda tid: self._tickets[tid]["created_at"], reverse=True
+        ):
+            ticket = self._tickets[ticket_id]
+            if ticket["status"] in ("resolved", "closed"):
+                continue
+            if now - ticket["created_at"] > self.duplicate_window:
+                continue
+            other_words = _summary_words(ticket["summary"])
+            overlap = len(words & other_words) / max(len(words | other_words), 1)
+            if overlap >= DUPLICATE_SUMMARY_SIMILARITY:
+                return ticket
+        return None
+
+    def create_ticket(
+        self,
+        summary: str,
+        email: Optional[str],
+        session_id: Optional[str] = None,
+        tenant_id: str = DEFAULT_TENANT,
+    ) -> Tuple[Dict[str, Any], bool]:
+        """Record a new ticket, or return the open duplicate of it, linking it to
+        the session so the session can look it up afterwards.
+        `email` is the address the customer gave; pass None when there is none,
+        so placeholder addresses are never indexed or used to match duplicates.
+        Returns (ticket, is_duplicate)."""
+        with self._lock:
+            now = time.time()
+            duplicate = self._find_duplicate(summary, email, session_id, tenant_id, now)
+            if duplicate is not None:
+                self.duplicates_suppressed += 1
+                if duplicate["ticket_id"] not in self._by_session[(tenant_id, session_id)]:
+                    self._append(
+                        {
+                            "event": "linked",
+                            "ticket_id": duplicate["ticket_id"],
+                            "session_id": session_id,
+                            "linked_at": now,
+                        }
+                    )
+                return dict(duplicate), True
+            ticket_id = self._new_ticket_id()
+            self._append(
+                {
+                    "event": "created",
+                    "ticket_id": ticket_id,
+                    "tenant_id": tenant_id,
+                    "email": email,
+                    "session_id": session_id,
+                    "summary": summary,
+                    "created_at": now,
+                }
+            )
+            return dict(self._tickets[ticket_id]), False
+
+    def update_status(
+        self, ticket_id: str, status: str, tenant_id: str = DEFAULT_TENANT
+    ) -> Dict[str, Any]:
+        if status not in TICKET_STATUSES:
+            raise ValueError(
+                f"Invalid ticket status {status!r}; expected one of {TICKET_STATUSES}"
+            )
+        with self._lock:
+            if self.get(ticket_id, tenant_id) is None:
+                raise KeyError(ticket_id)
+            self._append(
+                {
+                    "event": "status",
+                    "ticket_id": ticket_id,
+                    "status": status,
+                    "updated_at": time.time(),
+                }
+            )
+            return dict(self._tickets[ticket_id])
+
+    # --- Lookups (always scoped to one tenant) ---
+    def get(self, ticket_id: str, tenant_id: str = DEFAULT_TENANT) -> Optional[Dict[str, Any]]:
+        ticket = self._tickets.get(ticket_id)
+        if ticket is None or ticket["tenant_id"] != tenant_id:
+            return None
+        return dict(ticket)
+
+    def find_by_email(self, email: str, tenant_id: str = DEFAULT_TENANT) -> List[Dict[str, Any]]:
+        return [
+            dict(self._tickets[tid])
+            for tid in self._by_email.get((tenant_id, email.lower()), [])
+        ]
+
+    def find_by_session(
+        self, session_id: str, tenant_id: str = DEFAULT_TENANT
+    ) -> List[Dict[str, Any]]:
+        return [
+            dict(self._tickets[tid])
+            for tid in self._by_session.get((tenant_id, session_id), [])
+        ]
+
+    def find_for_session(
+        self, session_id: str, tenant_id: str = DEFAULT_TENANT
+    ) -> List[Dict[str, Any]]:
+        """Tickets a chat session may see, oldest first: those it created and those
+        it was linked to as a duplicate escalation. Other tickets for an email the
+        session gave are not included, since the email is not verified."""
+        return sorted(
+            self.find_by_session(session_id, tenant_id),
+            key=lambda ticket: ticket["created_at"],
+        )
+
+    def get_for_session(
+        self, ticket_id: str, session_id: str, tenant_id: str = DEFAULT_TENANT
+    ) -> Optional[Dict[str, Any]]:
+        """Look up a ticket by ID only if the session may see it."""
+        for ticket in self.find_for_session(session_id, tenant_id):
+            if ticket["ticket_id"] == ticket_id:
+                return ticket
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "tickets": len(self._tickets),
+            "records_written": self.records_written,
+            "unsynced_records": self._unsynced,
+            "duplicates_suppressed": self.duplicates_suppressed,
+        }
+
+
+def format_ticket_status(ticket: Dict[str, Any]) -> str:
+    created = time.strftime("%Y-%m-%d %H:%M", time.localtime(ticket["created_at"]))
+    return (
+        f"Ticket {ticket['ticket_id']} (opened {created}) is currently "
+        f"{ticket['status'].upper()}. Summary: {ticket['summary']}"
+    )
+
+
+ticket_journal = TicketJournal()
+
+# --- Active Session for the Current Request ---
+# Lets escalations made through the agents' tool record which chat session they came from.
+_active_session_id: ContextVar[Optional[str]] = ContextVar(
+    "active_ticket_session_id", default=None
+)
+
+
+def get_active_session_id() -> Optional[str]:
+    return _active_session_id.get()
+
+
+@contextmanager
+def use_ticket_session(session_id: str):
+    """Attribute tickets created inside this block to `session_id`."""
+    token = _active_session_id.set(session_id)
+    try:
+        yield session_id
+    finally:
+        _active_session_id.reset(token)
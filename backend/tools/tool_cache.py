@@ -0,0 +1,163 @@
+# backend/tools/tool_cache.py
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+
+# --- Cache Configuration ---
+# Time-to-live (seconds) for cached results of each tool. Billing data changes
+# when customers pay, so it gets the shortest TTL.
+TOOL_CACHE_TTLS: Dict[str, float] = {
+    "get_billing_info": 120,
+    "get_tech_solution": 600,
+    "get_faq_answer": 900,
+}
+
+# Events that make cached tool results stale, mapped to the tools they affect.
+INVALIDATION_EVENTS: Dict[str, List[str]] = {
+    "payment": ["get_billing_info"],
+    "plan_change": ["get_billing_info"],
+}
+
+# Words ignored when building cache keys, so rephrasings of one issue
+# ("my internet is not working" / "internet not working") share an entry.
+_STOPWORDS = {
+    "a", "an", "the", "my", "i", "is", "it", "its", "am", "are", "was", "me",
+    "please", "help", "with", "of", "to", "for", "on", "in", "and", "again",
+    "still", "can", "you", "check", "what", "whats", "s",
+}
+
+
+def normalize_key(value: str) -> str:
+    """Normalize a tool argument into a cache key that tolerates rephrasing."""
+    words = set(re.findall(r"[a-z0-9_]+", value.lower())) - _STOPWORDS
+    return " ".join(sorted(words)) or value.strip().lower()
+
+
+def register_invalidation(event: str, tool_name: str) -> None:
+    """Register a tool whose cached results are dropped when `event` fires."""
+    tools = INVALIDATION_EVENTS.setdefault(event, [])
+    if tool_name not in tools:
+        tools.append(tool_name)
+
+
+class ToolResultCache:
+    """Per-session memo cache for tool results with TTLs and usage stats."""
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None):
+        self.ttls = dict(TOOL_CACHE_TTLS if ttls is None else ttls)
+        self._entries: Dict[Tuple[str, str], Tuple[float, str]] = {}
+        self.tool_calls = 0
+        self.saved_tool_calls = 0
+        self.estimated_saved_iterations = 0
+        self.agent_turns = 0
+        self._turn_lookups = 0
+
+    def get(self, tool_name: str, key: str) -> Optional[str]:
+        entry = self._entries.get((tool_name, normalize_key(key)))
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if time.time() >= expires_at:
+            del self._entries[(tool_name, normalize_key(key))]
+            return None
+        return result
+
+    def put(self, tool_name: str, key: str, result: str) -> None:
+        ttl = self.ttls.get(tool_name, 0)
+        if ttl > 0:
+            self._entries[(tool_name, normalize_key(key))] = (time.time() + ttl, result)
+
+    def call(self, tool_name: str, key: str, compute: Callable[[], str]) -> str:
+        """Return the cached result for this call, computing it on a miss."""
+        self._turn_lookups += 1
+        cached = self.get(tool_name, key)
+        if cached is not None:
+            self.saved_tool_calls += 1
+            return cached
+        self.tool_calls += 1
+        result = compute()
+        self.put(tool_name, key, result)
+        return result
+
+    def invalidate(self, tool_name: Optional[str] = None, key: Optional[str] = None) -> int:
+        """Drop cached results for a tool (and optionally one key). Returns count."""
+        normalized = normalize_key(key) if key is not None else None
+        stale = [
+            entry_key
+            for entry_key in self._entries
+            if (tool_name is None or entry_key[0] == tool_name)
+            and (normalized is None or entry_key[1] == normalized)
+        ]
+        for entry_key in stale:
+            del self._entries[entry_key]
+        return len(stale)
+
+    def notify(self, event: str, key: Optional[str] = None) -> int:
+        """Invalidate every tool registered for `event`, e.g. after a payment."""
+        return sum(
+            self.invalidate(tool_name, key)
+            for tool_name in INVALIDATION_EVENTS.get(event, [])
+        )
+
+    def context_for(self, tool_name: str, key: str) -> str:
+        """Return the fresh cached result for exactly this tool call (same normalized
+        key), so it can be offered to an agent; empty if there is none."""
+        return self.get(tool_name, key) or ""
+
+    def begin_turn(self) -> None:
+        self._turn_lookups = 0
+
+    def end_turn(self, offered_context: bool, response: str = "") -> None:
+        """Record an agent turn. If the agent was offered the cached result of the call
+        it is instructed to make and answered without making any tool call, count an
+        estimated saved iteration. This is an estimate: we cannot observe whether the
+        agent would really have called the tool. Escalation hand-offs are excluded,
+        since those turns don't need a tool result."""
+        self.agent_turns += 1
+        if (
+            offered_context
+            and self._turn_lookups == 0
+            and not response.startswith("NEED_EMAIL_FOR_ESCALATION")
+        ):
+            self.estimated_saved_iterations += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "tool_calls": self.tool_calls,
+            "saved_tool_calls": self.saved_tool_calls,
+            "estimated_saved_iterations": self.estimated_saved_iterations,
+            "agent_turns": self.agent_turns,
+            "cached_entries": len(self._entries),
+        }
+
+
+# --- Active Cache for the Current Request ---
+# Tools are bound to agents at construction time, so the session's cache is
+# threaded to them through a context variable set by the orchestrator.
+_active_tool_cache: ContextVar[Optional[ToolResultCache]] = ContextVar(
+    "active_tool_cache", default=None
+)
+
+
+def get_active_tool_cache() -> Optional[ToolResultCache]:
+    return _active_tool_cache.get()
+
+
+@contextmanager
+def use_tool_cache(cache: ToolResultCache):
+    """Make `cache` the memo cache for tool calls made inside this block."""
+    token = _active_tool_cache.set(cache)
+    try:
+        yield cache
+    finally:
+        _active_tool_cache.reset(token)
+
+
+def memoized_tool_call(tool_name: str, key: str, compute: Callable[[], str]) -> str:
+    """Run a tool body through the active session cache, if there is one."""
+    cache = _active_tool_cache.get()
+    if cache is None:
+        return compute()
+    return cache.call(tool_name, key, compute)